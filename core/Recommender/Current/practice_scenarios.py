@@ -1,13 +1,335 @@
 # practice_scenarios.py
 
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import logging
 import random
+import numpy as np
+from functools import lru_cache
 from datetime import timedelta
+from types import MappingProxyType
+
+from shared_utils import freeze, njit, prange
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Templates are built once at import and shared read-only by every instance
+_SCENARIO_TEMPLATES = freeze({
+    'accuracy': {
+        'beginner': [
+            {
+                'name': 'Basic Target Practice',
+                'description': 'Hit 10 stationary targets within 45 seconds',
+                'success_criteria': 'Minimum 70% accuracy',
+                'difficulty': 1
+            },
+            {
+                'name': 'Precision Control',
+                'description': 'Hit 5 large targets in sequence without missing',
+                'success_criteria': 'No misses allowed',
+                'difficulty': 1
+            }
+        ],
+        'intermediate': [
+            {
+                'name': 'Moving Target Track',
+                'description': 'Hit 15 moving targets within 30 seconds',
+                'success_criteria': 'Minimum 75% accuracy',
+                'difficulty': 2
+            },
+            {
+                'name': 'Precision Flicks',
+                'description': 'Hit 10 targets that appear randomly within 20 seconds',
+                'success_criteria': 'Minimum 80% accuracy',
+                'difficulty': 2
+            }
+        ],
+        'advanced': [
+            {
+                'name': 'Speed Precision Challenge',
+                'description': 'Hit 20 small moving targets within 25 seconds',
+                'success_criteria': 'Minimum 85% accuracy',
+                'difficulty': 3
+            },
+            {
+                'name': 'Advanced Flick Training',
+                'description': 'Hit 15 targets that appear for only 0.5 seconds each',
+                'success_criteria': 'Minimum 90% accuracy',
+                'difficulty': 3
+            }
+        ]
+    },
+    'reaction_time': {
+        'beginner': [
+            {
+                'name': 'Basic Reaction Training',
+                'description': 'React to 10 visual cues within 5 seconds each',
+                'success_criteria': 'Average reaction time under 400ms',
+                'difficulty': 1
+            },
+            {
+                'name': 'Simple Choice Reaction',
+                'description': 'Respond to different colored targets correctly',
+                'success_criteria': 'Average reaction time under 450ms',
+                'difficulty': 1
+            }
+        ],
+        'intermediate': [
+            {
+                'name': 'Multi-Target Reaction',
+                'description': 'React to simultaneous targets in order',
+                'success_criteria': 'Average reaction time under 300ms',
+                'difficulty': 2
+            },
+            {
+                'name': 'Dynamic Response Training',
+                'description': 'React to changing patterns of targets',
+                'success_criteria': 'Average reaction time under 250ms',
+                'difficulty': 2
+            }
+        ],
+        'advanced': [
+            {
+                'name': 'Complex Reaction Challenge',
+                'description': 'React to multiple stimuli types with different responses',
+                'success_criteria': 'Average reaction time under 200ms',
+                'difficulty': 3
+            },
+            {
+                'name': 'Speed Precision Matrix',
+                'description': 'React to grid-based targets with precision requirements',
+                'success_criteria': 'Average reaction time under 180ms',
+                'difficulty': 3
+            }
+        ]
+    },
+    'decision_making': {
+        'beginner': [
+            {
+                'name': 'Basic Strategy Choices',
+                'description': 'Choose correct responses to simple game situations',
+                'success_criteria': '7/10 correct decisions',
+                'difficulty': 1
+            },
+            {
+                'name': 'Resource Management Basic',
+                'description': 'Allocate limited resources in simple scenarios',
+                'success_criteria': '70% efficiency in resource use',
+                'difficulty': 1
+            }
+        ],
+        'intermediate': [
+            {
+                'name': 'Tactical Decision Making',
+                'description': 'Make optimal choices in complex combat scenarios',
+                'success_criteria': '80% optimal decision rate',
+                'difficulty': 2
+            },
+            {
+                'name': 'Strategic Planning Exercise',
+                'description': 'Plan and execute multi-step strategies',
+                'success_criteria': 'Complete objective within time limit',
+                'difficulty': 2
+            }
+        ],
+        'advanced': [
+            {
+                'name': 'Advanced Tactical Simulator',
+                'description': 'Handle complex, multi-variable combat situations',
+                'success_criteria': '90% optimal decision rate',
+                'difficulty': 3
+            },
+            {
+                'name': 'Leadership Decision Challenge',
+                'description': 'Make team-wide strategic decisions under pressure',
+                'success_criteria': 'Successfully lead team to objective',
+                'difficulty': 3
+            }
+        ]
+    },
+    'teamwork': {
+        'beginner': [
+            {
+                'name': 'Basic Communication Drill',
+                'description': 'Relay simple information to teammates accurately',
+                'success_criteria': '80% communication accuracy',
+                'difficulty': 1
+            },
+            {
+                'name': 'Team Role Practice',
+                'description': 'Execute basic role-specific tasks in team context',
+                'success_criteria': 'Complete all role tasks',
+                'difficulty': 1
+            }
+        ],
+        'intermediate': [
+            {
+                'name': 'Coordination Exercise',
+                'description': 'Execute synchronized team movements and actions',
+                'success_criteria': '85% synchronization accuracy',
+                'difficulty': 2
+            },
+            {
+                'name': 'Strategic Communication',
+                'description': 'Coordinate complex team maneuvers with clear communication',
+                'success_criteria': '90% successful coordination',
+                'difficulty': 2
+            }
+        ],
+        'advanced': [
+            {
+                'name': 'Team Leadership Drill',
+                'description': 'Lead team through complex scenarios with multiple objectives',
+                'success_criteria': 'Complete all objectives with 90% team efficiency',
+                'difficulty': 3
+            },
+            {
+                'name': 'Advanced Team Tactics',
+                'description': 'Execute professional-level team strategies in high-pressure situations',
+                'success_criteria': 'Achieve victory with optimal resource usage',
+                'difficulty': 3
+            }
+        ]
+    }
+})
+
+# Flattened (metric, skill_level) -> scenarios table for single-probe lookups
+_FLAT_SCENARIOS = MappingProxyType({
+    (metric, level): scenarios
+    for metric, levels in _SCENARIO_TEMPLATES.items()
+    for level, scenarios in levels.items()
+})
+
+def _difficulty_array(scenarios) -> np.ndarray:
+    """Build a read-only array of template difficulties."""
+    difficulties = np.array([scenario['difficulty'] for scenario in scenarios], dtype=np.float64)
+    difficulties.setflags(write=False)
+    return difficulties
+
+# Template difficulties per (metric, skill_level), used for batched customization
+_FLAT_DIFFICULTIES = MappingProxyType({
+    key: _difficulty_array(scenarios)
+    for key, scenarios in _FLAT_SCENARIOS.items()
+})
+
+@njit('float64(float64, float64)', cache=True)
+def _difficulty_adjustment(current_level, target_level):
+    """Calculate difficulty adjustment based on skill gap."""
+    skill_gap = target_level - current_level
+    return min(max(-0.5, skill_gap / 10), 0.5)
+
+@njit(cache=True)
+def _scenario_impact(difficulties):
+    """Estimate improvement per successful completion for each scenario."""
+    base_improvement = 0.05  # 5% improvement per successful completion
+    difficulty_multiplier = 1 + (difficulties * 0.2)
+    return base_improvement * difficulty_multiplier
+
+@njit(cache=True)
+def _recommended_attempts(difficulties):
+    """Calculate recommended number of attempts for each scenario."""
+    base_attempts = 5
+    difficulty_factor = 1 + (difficulties * 0.5)
+    return np.maximum(3, (base_attempts * difficulty_factor).astype(np.int64))
+
+def _build_difficulty_table() -> Tuple[Dict, np.ndarray, np.ndarray]:
+    """Pack template difficulties into a padded (templates x scenarios) table for batch kernels."""
+    keys = tuple(_FLAT_DIFFICULTIES)
+    counts = np.array([len(_FLAT_DIFFICULTIES[key]) for key in keys], dtype=np.int64)
+    table = np.zeros((len(keys), int(counts.max())), dtype=np.float64)
+    for row, key in enumerate(keys):
+        table[row, :counts[row]] = _FLAT_DIFFICULTIES[key]
+    table.setflags(write=False)
+    counts.setflags(write=False)
+    return MappingProxyType({key: row for row, key in enumerate(keys)}), table, counts
+
+# Template row index per (metric, skill_level) plus padded difficulties and scenario counts
+_TEMPLATE_INDEX, _DIFFICULTY_TABLE, _SCENARIO_COUNTS = _build_difficulty_table()
+
+@njit(parallel=True, cache=True)
+def _batch_plan(template_idx, current, target, difficulties, counts,
+                out_adjusted, out_improvement, out_attempts):
+    """Compute customized scenario parameters for many recommendations in parallel."""
+    for p in prange(template_idx.shape[0]):
+        row = template_idx[p]
+        count = counts[row]
+        scenario_difficulties = difficulties[row, :count]
+        adjustment = _difficulty_adjustment(current[p], target[p])
+        out_adjusted[p, :count] = scenario_difficulties + adjustment
+        out_improvement[p, :count] = _scenario_impact(scenario_difficulties)
+        out_attempts[p, :count] = _recommended_attempts(scenario_difficulties)
+
+# Number of milestones in a progression path
+_PROGRESSION_STEPS = 4
+
+# Per-metric milestone requirement as (field, value at zero progress, change at full progress)
+_REQ_PARAMS = MappingProxyType({
+    'accuracy': ('min_success_rate', 70.0, 20.0),
+    'reaction_time': ('max_average_time', 400.0, -200.0),
+    'decision_making': ('min_correct_decisions', 70.0, 20.0),
+    'teamwork': ('min_coordination_score', 70.0, 20.0)
+})
+_DEFAULT_REQ_PARAMS = _REQ_PARAMS['accuracy']
+
+# Features unlocked by progression milestones for each metric
+_BASE_UNLOCKS = MappingProxyType({
+    'accuracy': (
+        'New target patterns',
+        'Advanced scoring modes',
+        'Custom challenge creation'
+    ),
+    'reaction_time': (
+        'Complex stimulus patterns',
+        'Multi-target scenarios',
+        'Speed run modes'
+    ),
+    'decision_making': (
+        'Advanced scenario types',
+        'Strategy analysis tools',
+        'Custom scenario creation'
+    ),
+    'teamwork': (
+        'Advanced team roles',
+        'Leadership tools',
+        'Custom drill creation'
+    )
+})
+_DEFAULT_UNLOCKS = _BASE_UNLOCKS['accuracy']
+
+@njit('Tuple((float64[:], float64[:], int64[:]))(float64, float64, float64, float64, int64)', cache=True)
+def _progression(current_level, target_level, base, slope, steps):
+    """Compute milestone levels, requirements and completion counts for a progression path."""
+    progress = np.arange(1, steps + 1) / steps
+    levels = current_level + ((target_level - current_level) * progress)
+    requirements = base + (slope * progress)
+    consecutive = 3 + (2 * progress).astype(np.int64)
+    return levels, requirements, consecutive
+
+@lru_cache(maxsize=2048)
+def _progression_cached(metric: str, current_level: float, target_level: float) -> Tuple:
+    """
+    Compute (level, requirements) pairs for each milestone of a progression path.
+    
+    Results are cached per input, so the requirement mappings are read-only and
+    callers must copy them before handing them out.
+    """
+    requirement_key, base, slope = _REQ_PARAMS.get(metric, _DEFAULT_REQ_PARAMS)
+    levels, requirements, consecutive = _progression(
+        current_level,
+        target_level,
+        base,
+        slope,
+        _PROGRESSION_STEPS
+    )
+    
+    return tuple(
+        (level, MappingProxyType({
+            requirement_key: requirement,
+            'consecutive_completions': completions
+        }))
+        for level, requirement, completions in zip(
+            levels.tolist(), requirements.tolist(), consecutive.tolist())
+    )
+
 class ScenarioGenerator:
     """
     A class to generate specific practice scenarios based on skill recommendations.
@@ -15,184 +337,9 @@ class ScenarioGenerator:
     
     def __init__(self):
         """Initialize the scenario generator with predefined scenario templates."""
-        self.scenario_templates = {
-            'accuracy': {
-                'beginner': [
-                    {
-                        'name': 'Basic Target Practice',
-                        'description': 'Hit 10 stationary targets within 45 seconds',
-                        'success_criteria': 'Minimum 70% accuracy',
-                        'difficulty': 1
-                    },
-                    {
-                        'name': 'Precision Control',
-                        'description': 'Hit 5 large targets in sequence without missing',
-                        'success_criteria': 'No misses allowed',
-                        'difficulty': 1
-                    }
-                ],
-                'intermediate': [
-                    {
-                        'name': 'Moving Target Track',
-                        'description': 'Hit 15 moving targets within 30 seconds',
-                        'success_criteria': 'Minimum 75% accuracy',
-                        'difficulty': 2
-                    },
-                    {
-                        'name': 'Precision Flicks',
-                        'description': 'Hit 10 targets that appear randomly within 20 seconds',
-                        'success_criteria': 'Minimum 80% accuracy',
-                        'difficulty': 2
-                    }
-                ],
-                'advanced': [
-                    {
-                        'name': 'Speed Precision Challenge',
-                        'description': 'Hit 20 small moving targets within 25 seconds',
-                        'success_criteria': 'Minimum 85% accuracy',
-                        'difficulty': 3
-                    },
-                    {
-                        'name': 'Advanced Flick Training',
-                        'description': 'Hit 15 targets that appear for only 0.5 seconds each',
-                        'success_criteria': 'Minimum 90% accuracy',
-                        'difficulty': 3
-                    }
-                ]
-            },
-            'reaction_time': {
-                'beginner': [
-                    {
-                        'name': 'Basic Reaction Training',
-                        'description': 'React to 10 visual cues within 5 seconds each',
-                        'success_criteria': 'Average reaction time under 400ms',
-                        'difficulty': 1
-                    },
-                    {
-                        'name': 'Simple Choice Reaction',
-                        'description': 'Respond to different colored targets correctly',
-                        'success_criteria': 'Average reaction time under 450ms',
-                        'difficulty': 1
-                    }
-                ],
-                'intermediate': [
-                    {
-                        'name': 'Multi-Target Reaction',
-                        'description': 'React to simultaneous targets in order',
-                        'success_criteria': 'Average reaction time under 300ms',
-                        'difficulty': 2
-                    },
-                    {
-                        'name': 'Dynamic Response Training',
-                        'description': 'React to changing patterns of targets',
-                        'success_criteria': 'Average reaction time under 250ms',
-                        'difficulty': 2
-                    }
-                ],
-                'advanced': [
-                    {
-                        'name': 'Complex Reaction Challenge',
-                        'description': 'React to multiple stimuli types with different responses',
-                        'success_criteria': 'Average reaction time under 200ms',
-                        'difficulty': 3
-                    },
-                    {
-                        'name': 'Speed Precision Matrix',
-                        'description': 'React to grid-based targets with precision requirements',
-                        'success_criteria': 'Average reaction time under 180ms',
-                        'difficulty': 3
-                    }
-                ]
-            },
-            'decision_making': {
-                'beginner': [
-                    {
-                        'name': 'Basic Strategy Choices',
-                        'description': 'Choose correct responses to simple game situations',
-                        'success_criteria': '7/10 correct decisions',
-                        'difficulty': 1
-                    },
-                    {
-                        'name': 'Resource Management Basic',
-                        'description': 'Allocate limited resources in simple scenarios',
-                        'success_criteria': '70% efficiency in resource use',
-                        'difficulty': 1
-                    }
-                ],
-                'intermediate': [
-                    {
-                        'name': 'Tactical Decision Making',
-                        'description': 'Make optimal choices in complex combat scenarios',
-                        'success_criteria': '80% optimal decision rate',
-                        'difficulty': 2
-                    },
-                    {
-                        'name': 'Strategic Planning Exercise',
-                        'description': 'Plan and execute multi-step strategies',
-                        'success_criteria': 'Complete objective within time limit',
-                        'difficulty': 2
-                    }
-                ],
-                'advanced': [
-                    {
-                        'name': 'Advanced Tactical Simulator',
-                        'description': 'Handle complex, multi-variable combat situations',
-                        'success_criteria': '90% optimal decision rate',
-                        'difficulty': 3
-                    },
-                    {
-                        'name': 'Leadership Decision Challenge',
-                        'description': 'Make team-wide strategic decisions under pressure',
-                        'success_criteria': 'Successfully lead team to objective',
-                        'difficulty': 3
-                    }
-                ]
-            },
-            'teamwork': {
-                'beginner': [
-                    {
-                        'name': 'Basic Communication Drill',
-                        'description': 'Relay simple information to teammates accurately',
-                        'success_criteria': '80% communication accuracy',
-                        'difficulty': 1
-                    },
-                    {
-                        'name': 'Team Role Practice',
-                        'description': 'Execute basic role-specific tasks in team context',
-                        'success_criteria': 'Complete all role tasks',
-                        'difficulty': 1
-                    }
-                ],
-                'intermediate': [
-                    {
-                        'name': 'Coordination Exercise',
-                        'description': 'Execute synchronized team movements and actions',
-                        'success_criteria': '85% synchronization accuracy',
-                        'difficulty': 2
-                    },
-                    {
-                        'name': 'Strategic Communication',
-                        'description': 'Coordinate complex team maneuvers with clear communication',
-                        'success_criteria': '90% successful coordination',
-                        'difficulty': 2
-                    }
-                ],
-                'advanced': [
-                    {
-                        'name': 'Team Leadership Drill',
-                        'description': 'Lead team through complex scenarios with multiple objectives',
-                        'success_criteria': 'Complete all objectives with 90% team efficiency',
-                        'difficulty': 3
-                    },
-                    {
-                        'name': 'Advanced Team Tactics',
-                        'description': 'Execute professional-level team strategies in high-pressure situations',
-                        'success_criteria': 'Achieve victory with optimal resource usage',
-                        'difficulty': 3
-                    }
-                ]
-            }
-        }
+        self.scenario_templates = _SCENARIO_TEMPLATES
+        self._flat_scenarios = _FLAT_SCENARIOS
+        self._flat_difficulties = _FLAT_DIFFICULTIES
         logger.info("Scenario Generator initialized with predefined templates")
 
     def generate_practice_plan(self, 
@@ -208,164 +355,238 @@ class ScenarioGenerator:
         Returns:
             List[Dict]: Structured practice scenarios
         """
-        practice_plan = []
+        practice_plan = list(self.iter_practice_plan(recommendations, player_preferences))
         
-        for rec in recommendations:
-            metric = rec['metric']
-            skill_level = rec['skill_level']
-            
-            if metric in self.scenario_templates and skill_level in self.scenario_templates[metric]:
-                # Get base scenarios for the skill level
-                base_scenarios = self.scenario_templates[metric][skill_level]
-                
-                # Select and customize scenarios
-                scenarios = self._customize_scenarios(
-                    base_scenarios,
-                    rec,
-                    player_preferences
-                )
-                
-                practice_plan.append({
-                    'metric': metric,
-                    'skill_level': skill_level,
-                    'target_improvement': rec['target_level'] - rec['current_level'],
-                    'scenarios': scenarios,
-                    'progression_path': self._generate_progression_path(rec)
-                })
-        
-        logger.info(f"Generated practice plan with {len(practice_plan)} focus areas")
+        logger.info("Generated practice plan with %d focus areas", len(practice_plan))
         return practice_plan
 
-    def _customize_scenarios(self, 
-                           base_scenarios: List[Dict],
-                           recommendation: Dict,
-                           player_preferences: Optional[Dict] = None) -> List[Dict]:
+    def iter_practice_plan(self,
+                           recommendations: Iterable[Dict],
+                           player_preferences: Optional[Dict] = None) -> Iterator[Dict]:
         """
-        Customize scenarios based on player's current level and preferences.
+        Lazily generate practice plan entries based on skill recommendations.
+        
+        Entries are built one at a time as the caller consumes them, so streaming
+        consumers never hold the whole plan in memory.
         
         Args:
-            base_scenarios (List[Dict]): Base scenario templates
-            recommendation (Dict): Skill improvement recommendation
+            recommendations (Iterable[Dict]): Skill improvement recommendations
             player_preferences (Dict, optional): Player's preferred practice styles
             
-        Returns:
-            List[Dict]: Customized practice scenarios
+        Yields:
+            Dict: Practice plan entry for each recommendation with a known template
         """
-        customized = []
+        for rec in recommendations:
+            if (rec['metric'], rec['skill_level']) in self._flat_scenarios:
+                yield self._build_plan_entry(rec, player_preferences)
+
+    def generate_practice_plans(self,
+                              batch_recommendations: List[List[Dict]],
+                              player_preferences: Optional[Dict] = None) -> List[List[Dict]]:
+        """
+        Generate practice plans for many players at once.
+        
+        Scenario parameters for every (player, recommendation) pair are computed
+        in a single parallel kernel before the plan dicts are assembled.
         
-        for scenario in base_scenarios:
-            # Create a copy of the base scenario
-            custom_scenario = scenario.copy()
+        Args:
+            batch_recommendations (List[List[Dict]]): Skill improvement recommendations per player
+            player_preferences (Dict, optional): Preferred practice styles applied to all players
             
-            # Adjust difficulty based on current level
-            difficulty_adjustment = self._calculate_difficulty_adjustment(
-                recommendation['current_level'],
-                recommendation['target_level']
+        Returns:
+            List[List[Dict]]: Structured practice scenarios per player
+        """
+        # Flatten players x recommendations into SoA arrays of templated recommendations
+        entries = [
+            (player, rec, _TEMPLATE_INDEX[(rec['metric'], rec['skill_level'])])
+            for player, recommendations in enumerate(batch_recommendations)
+            for rec in recommendations
+            if (rec['metric'], rec['skill_level']) in _TEMPLATE_INDEX
+        ]
+        count = len(entries)
+        template_idx = np.fromiter((row for _, _, row in entries), dtype=np.int64, count=count)
+        current = np.fromiter((rec['current_level'] for _, rec, _ in entries), dtype=np.float64, count=count)
+        target = np.fromiter((rec['target_level'] for _, rec, _ in entries), dtype=np.float64, count=count)
+        
+        width = _DIFFICULTY_TABLE.shape[1]
+        adjusted = np.zeros((count, width), dtype=np.float64)
+        improvement = np.zeros((count, width), dtype=np.float64)
+        attempts = np.zeros((count, width), dtype=np.int64)
+        
+        _batch_plan(
+            template_idx,
+            current,
+            target,
+            _DIFFICULTY_TABLE,
+            _SCENARIO_COUNTS,
+            adjusted,
+            improvement,
+            attempts
+        )
+        
+        plans = [[] for _ in batch_recommendations]
+        
+        for p, (player, rec, row) in enumerate(entries):
+            scenario_count = _SCENARIO_COUNTS[row]
+            scenarios = self._assemble_scenarios(
+                self._flat_scenarios[(rec['metric'], rec['skill_level'])],
+                adjusted[p, :scenario_count].tolist(),
+                improvement[p, :scenario_count].tolist(),
+                attempts[p, :scenario_count].tolist(),
+                player_preferences
             )
-            
-            # Modify scenario parameters
-            custom_scenario.update({
-                'adjusted_difficulty': scenario['difficulty'] + difficulty_adjustment,
-                'estimated_improvement': self._estimate_scenario_impact(
-                    scenario,
-                    recommendation
-                ),
-                'recommended_attempts': self._calculate_recommended_attempts(
-                    scenario,
-                    recommendation
-                )
+            plans[player].append({
+                'metric': rec['metric'],
+                'skill_level': rec['skill_level'],
+                'target_improvement': rec['target_level'] - rec['current_level'],
+                'scenarios': scenarios,
+                'progression_path': self._generate_progression_path(rec)
             })
-            
-            # Apply player preferences if available
-            if player_preferences:
-                custom_scenario = self._apply_player_preferences(
-                    custom_scenario,
-                    player_preferences
-                )
-            
-            customized.append(custom_scenario)
         
-        return customized
+        logger.info("Generated practice plans for %d players", len(plans))
+        return plans
 
-    def _calculate_difficulty_adjustment(self, 
-                                      current_level: float,
-                                      target_level: float) -> float:
+    def _build_plan_entry(self,
+                          recommendation: Dict,
+                          player_preferences: Optional[Dict] = None) -> Dict:
         """
-        Calculate difficulty adjustment based on skill gap.
+        Build the practice plan entry for a single recommendation.
         
         Args:
-            current_level (float): Current skill level
-            target_level (float): Target skill level
+            recommendation (Dict): Skill improvement recommendation with a known template
+            player_preferences (Dict, optional): Player's preferred practice styles
             
         Returns:
-            float: Difficulty adjustment factor
+            Dict: Practice plan entry with scenarios and progression path
         """
-        skill_gap = target_level - current_level
-        return min(max(-0.5, skill_gap / 10), 0.5)
+        key = (recommendation['metric'], recommendation['skill_level'])
+        
+        # Select and customize scenarios for the skill level
+        scenarios = self._customize_scenarios(
+            self._flat_scenarios[key],
+            recommendation,
+            player_preferences,
+            self._flat_difficulties[key]
+        )
+        
+        return {
+            'metric': recommendation['metric'],
+            'skill_level': recommendation['skill_level'],
+            'target_improvement': recommendation['target_level'] - recommendation['current_level'],
+            'scenarios': scenarios,
+            'progression_path': self._generate_progression_path(recommendation)
+        }
 
-    def _estimate_scenario_impact(self, 
-                                scenario: Dict,
-                                recommendation: Dict) -> float:
+    def _customize_scenarios(self, 
+                           base_scenarios: List[Dict],
+                           recommendation: Dict,
+                           player_preferences: Optional[Dict] = None,
+                           difficulties: Optional[np.ndarray] = None) -> List[Dict]:
         """
-        Estimate the improvement impact of a scenario.
+        Customize scenarios based on player's current level and preferences.
         
         Args:
-            scenario (Dict): Practice scenario
+            base_scenarios (List[Dict]): Base scenario templates
             recommendation (Dict): Skill improvement recommendation
+            player_preferences (Dict, optional): Player's preferred practice styles
+            difficulties (np.ndarray, optional): Precomputed difficulties of base_scenarios
             
         Returns:
-            float: Estimated improvement per successful completion
+            List[Dict]: Customized practice scenarios
         """
-        base_improvement = 0.05  # 5% improvement per successful completion
-        difficulty_multiplier = 1 + (scenario['difficulty'] * 0.2)
+        if difficulties is None:
+            difficulties = np.fromiter(
+                (scenario['difficulty'] for scenario in base_scenarios),
+                dtype=np.float64,
+                count=len(base_scenarios)
+            )
+        
+        # Adjust difficulty based on current level
+        difficulty_adjustment = _difficulty_adjustment(
+            recommendation['current_level'],
+            recommendation['target_level']
+        )
         
-        return base_improvement * difficulty_multiplier
+        # Compute scenario parameters for all scenarios at once
+        adjusted_difficulties = (difficulties + difficulty_adjustment).tolist()
+        estimated_improvements = _scenario_impact(difficulties).tolist()
+        recommended_attempts = _recommended_attempts(difficulties).tolist()
+        
+        return self._assemble_scenarios(
+            base_scenarios,
+            adjusted_difficulties,
+            estimated_improvements,
+            recommended_attempts,
+            player_preferences
+        )
 
-    def _calculate_recommended_attempts(self, 
-                                     scenario: Dict,
-                                     recommendation: Dict) -> int:
+    def _assemble_scenarios(self,
+                            base_scenarios: List[Dict],
+                            adjusted_difficulties: List[float],
+                            estimated_improvements: List[float],
+                            recommended_attempts: List[int],
+                            player_preferences: Optional[Dict] = None) -> List[Dict]:
         """
-        Calculate recommended number of attempts for a scenario.
+        Combine base scenarios with their computed parameters.
         
         Args:
-            scenario (Dict): Practice scenario
-            recommendation (Dict): Skill improvement recommendation
+            base_scenarios (List[Dict]): Base scenario templates
+            adjusted_difficulties (List[float]): Adjusted difficulty per scenario
+            estimated_improvements (List[float]): Estimated improvement per scenario
+            recommended_attempts (List[int]): Recommended attempts per scenario
+            player_preferences (Dict, optional): Player's preferred practice styles
             
         Returns:
-            int: Recommended number of attempts
+            List[Dict]: Customized practice scenarios
         """
-        base_attempts = 5
-        difficulty_factor = 1 + (scenario['difficulty'] * 0.5)
-        return max(3, int(base_attempts * difficulty_factor))
+        customized = []
+        
+        for i, scenario in enumerate(base_scenarios):
+            # Merge customized parameters into a new scenario dict
+            custom_scenario = {
+                **scenario,
+                'adjusted_difficulty': adjusted_difficulties[i],
+                'estimated_improvement': estimated_improvements[i],
+                'recommended_attempts': recommended_attempts[i]
+            }
+            
+            # Apply player preferences if available
+            if player_preferences:
+                custom_scenario = self._apply_player_preferences(
+                    custom_scenario,
+                    player_preferences
+                )
+            
+            customized.append(custom_scenario)
+        
+        return customized
 
     def _apply_player_preferences(self, 
                                 scenario: Dict,
                                 preferences: Dict) -> Dict:
         """
-        Modify scenario based on player preferences.
+        Modify scenario in place based on player preferences.
         
         Args:
-            scenario (Dict): Practice scenario
+            scenario (Dict): Practice scenario owned by the caller
             preferences (Dict): Player's preferences
             
         Returns:
             Dict: Modified scenario
         """
-        modified = scenario.copy()
-        
         if 'preferred_duration' in preferences:
             # Adjust time limits based on preference
             time_factor = preferences['preferred_duration'] / 30  # 30 seconds as base
-            modified['description'] = self._adjust_time_limit(
-                modified['description'],
+            scenario['description'] = self._adjust_time_limit(
+                scenario['description'],
                 time_factor
             )
         
         if 'preferred_difficulty' in preferences:
             # Adjust difficulty based on preference
-            modified['adjusted_difficulty'] *= preferences['preferred_difficulty']
+            scenario['adjusted_difficulty'] *= preferences['preferred_difficulty']
         
-        return modified
+        return scenario
 
     def _generate_progression_path(self, recommendation: Dict) -> List[Dict]:
         """
@@ -377,64 +598,27 @@ class ScenarioGenerator:
         Returns:
             List[Dict]: Progression path with milestones
         """
-        current_level = recommendation['current_level']
-        target_level = recommendation['target_level']
-        total_improvement = target_level - current_level
+        metric = recommendation['metric']
+        steps = _PROGRESSION_STEPS
         
         milestones = []
-        steps = 4  # Number of progression steps
         
-        for i in range(steps):
-            progress = (i + 1) / steps
-            milestone_level = current_level + (total_improvement * progress)
-            
+        for i, (level, requirements) in enumerate(_progression_cached(
+                metric,
+                float(recommendation['current_level']),
+                float(recommendation['target_level']))):
             milestones.append({
-                'level': milestone_level,
-                'requirements': self._generate_milestone_requirements(
-                    recommendation['metric'],
-                    progress
-                ),
+                'level': level,
+                'requirements': dict(requirements),
                 'unlocks': self._generate_milestone_unlocks(
-                    recommendation['metric'],
-                    progress
+                    metric,
+                    (i + 1) / steps
                 )
             })
         
         return milestones
 
-    def _generate_milestone_requirements(self, metric: str, progress: float) -> Dict:
-        """
-        Generate requirements for reaching a milestone.
-        
-        Args:
-            metric (str): Skill metric
-            progress (float): Progress through the improvement path
-            
-        Returns:
-            Dict: Milestone requirements
-        """
-        base_requirements = {
-            'accuracy': {
-                'min_success_rate': 70 + (20 * progress),
-                'consecutive_completions': 3 + int(2 * progress)
-            },
-            'reaction_time': {
-                'max_average_time': 400 - (200 * progress),
-                'consecutive_completions': 3 + int(2 * progress)
-            },
-            'decision_making': {
-                'min_correct_decisions': 70 + (20 * progress),
-                'consecutive_completions': 3 + int(2 * progress)
-            },
-            'teamwork': {
-                'min_coordination_score': 70 + (20 * progress),
-                'consecutive_completions': 3 + int(2 * progress)
-            }
-        }
-        
-        return base_requirements.get(metric, base_requirements['accuracy'])
-
-    def _generate_milestone_unlocks(self, metric: str, progress: float) -> List[str]:
+    def _generate_milestone_unlocks(self, metric: str, progress: float) -> Tuple[str, ...]:
         """
         Generate rewards/unlocks for reaching a milestone.
         
@@ -443,29 +627,6 @@ class ScenarioGenerator:
             progress (float): Progress through the improvement path
             
         Returns:
-            List[str]: Unlocked features or achievements
+            Tuple[str, ...]: Unlocked features or achievements
         """
-        base_unlocks = {
-            'accuracy': [
-                'New target patterns',
-                'Advanced scoring modes',
-                'Custom challenge creation'
-            ],
-            'reaction_time': [
-                'Complex stimulus patterns',
-                'Multi-target scenarios',
-                'Speed run modes'
-            ],
-            'decision_making': [
-                'Advanced scenario types',
-                'Strategy analysis tools',
-                'Custom scenario creation'
-            ],
-            'teamwork': [
-                'Advanced team roles',
-                'Leadership tools',
-                'Custom drill creation'
-            ]
-        }
-        
-        metric_unlocks = base_unlocks.get(metric, base_unlocks['accuracy'])
\ No newline at end of file
+        return _BASE_UNLOCKS.get(metric, _DEFAULT_UNLOCKS)
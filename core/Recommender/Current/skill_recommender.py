@@ -1,12 +1,201 @@
 # skill_recommender.py
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+from enum import IntEnum
 import logging
+import numpy as np
+from functools import lru_cache
 from datetime import timedelta
+from types import MappingProxyType
+
+from shared_utils import freeze, njit
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _with_week_counts(strategies: Dict) -> Dict:
+    """Store each strategy's duration as a whole number of weeks alongside it."""
+    for levels in strategies.values():
+        for strategy in levels.values():
+            strategy['weeks'] = strategy['duration'].days // 7
+    return strategies
+
+# Templates are built once at import and shared read-only by every instance
+_SKILL_STRATEGIES = freeze(_with_week_counts({
+    'accuracy': {
+        'beginner': {
+            'practices': [
+                "Practice basic aiming drills for 15 minutes daily",
+                "Focus on stationary target practice",
+                "Use training maps with larger targets"
+            ],
+            'duration': timedelta(weeks=2),
+            'intensity': 'low'
+        },
+        'intermediate': {
+            'practices': [
+                "Practice precision aiming drills for 20 minutes daily",
+                "Incorporate moving target practice",
+                "Use aim trainer software for varied scenarios"
+            ],
+            'duration': timedelta(weeks=3),
+            'intensity': 'medium'
+        },
+        'advanced': {
+            'practices': [
+                "Practice advanced aiming techniques for 30 minutes daily",
+                "Focus on flick shots and micro-adjustments",
+                "Incorporate pressure training scenarios"
+            ],
+            'duration': timedelta(weeks=4),
+            'intensity': 'high'
+        }
+    },
+    'reaction_time': {
+        'beginner': {
+            'practices': [
+                "Practice basic reaction exercises for 10 minutes daily",
+                "Use simple reaction time training tools",
+                "Focus on consistent timing patterns"
+            ],
+            'duration': timedelta(weeks=2),
+            'intensity': 'low'
+        },
+        'intermediate': {
+            'practices': [
+                "Practice varied reaction drills for 20 minutes daily",
+                "Incorporate multiple stimulus types",
+                "Use advanced reaction training software"
+            ],
+            'duration': timedelta(weeks=3),
+            'intensity': 'medium'
+        },
+        'advanced': {
+            'practices': [
+                "Practice complex reaction scenarios for 25 minutes daily",
+                "Focus on multi-target acquisition",
+                "Incorporate decision-making elements"
+            ],
+            'duration': timedelta(weeks=4),
+            'intensity': 'high'
+        }
+    },
+    'decision_making': {
+        'beginner': {
+            'practices': [
+                "Review gameplay recordings for 15 minutes daily",
+                "Practice basic strategy scenarios",
+                "Focus on fundamental decision trees"
+            ],
+            'duration': timedelta(weeks=2),
+            'intensity': 'low'
+        },
+        'intermediate': {
+            'practices': [
+                "Analyze pro gameplay videos for 20 minutes daily",
+                "Practice situational awareness exercises",
+                "Participate in structured scrimmages"
+            ],
+            'duration': timedelta(weeks=3),
+            'intensity': 'medium'
+        },
+        'advanced': {
+            'practices': [
+                "Study advanced tactics for 30 minutes daily",
+                "Practice complex decision-making scenarios",
+                "Lead team strategy sessions"
+            ],
+            'duration': timedelta(weeks=4),
+            'intensity': 'high'
+        }
+    },
+    'teamwork': {
+        'beginner': {
+            'practices': [
+                "Practice basic communication drills",
+                "Focus on role-specific responsibilities",
+                "Participate in casual team games"
+            ],
+            'duration': timedelta(weeks=2),
+            'intensity': 'low'
+        },
+        'intermediate': {
+            'practices': [
+                "Practice advanced communication strategies",
+                "Focus on team coordination exercises",
+                "Participate in organized team practice"
+            ],
+            'duration': timedelta(weeks=3),
+            'intensity': 'medium'
+        },
+        'advanced': {
+            'practices': [
+                "Lead team coordination drills",
+                "Develop and execute team strategies",
+                "Organize scrimmage sessions"
+            ],
+            'duration': timedelta(weeks=4),
+            'intensity': 'high'
+        }
+    }
+}), intern_strings=True)
+
+class Metric(IntEnum):
+    """Performance metrics with template strategies, used as table indices."""
+    ACCURACY = 0
+    REACTION_TIME = 1
+    DECISION_MAKING = 2
+    TEAMWORK = 3
+
+class SkillLevel(IntEnum):
+    """Skill levels in ascending order, used as table indices."""
+    BEGINNER = 0
+    INTERMEDIATE = 1
+    ADVANCED = 2
+
+# String <-> index conversions, applied only at the API boundary
+_METRIC_BY_NAME = MappingProxyType({metric.name.lower(): metric for metric in Metric})
+_SKILL_LEVELS = tuple(SkillLevel)
+_SKILL_LEVEL_NAMES = tuple(level.name.lower() for level in SkillLevel)
+
+# Strategies indexed as _STRATEGY_TABLE[metric][skill_level]
+_STRATEGY_TABLE = tuple(
+    tuple(_SKILL_STRATEGIES[metric.name.lower()][level_name] for level_name in _SKILL_LEVEL_NAMES)
+    for metric in Metric
+)
+
+# Metric-specific (beginner, intermediate) upper thresholds in ascending order, indexed by Metric
+_THRESHOLD_TABLE = (
+    np.array([60.0, 80.0]),      # accuracy
+    np.array([-300.0, -200.0]),  # reaction_time: negated ms, lower is better
+    np.array([65.0, 85.0]),      # decision_making
+    np.array([70.0, 85.0])       # teamwork
+)
+_DEFAULT_THRESHOLDS = np.array([50.0, 75.0])
+
+@njit('Tuple((int64[:], float64[:]))(float64, float64, int64)', cache=True)
+def _timeline(current_level, weekly_improvement, weeks_count):
+    """Compute week numbers and expected levels for an improvement timeline."""
+    weeks = np.arange(1, weeks_count + 1)
+    levels = current_level + (weekly_improvement * weeks)
+    return weeks, levels
+
+# Share of the remaining skill gap expected to close each week, per training intensity
+_INTENSITY_FACTORS = MappingProxyType({
+    'low': 0.1,
+    'medium': 0.15,
+    'high': 0.2
+})
+
+@lru_cache(maxsize=1024)
+def _timeline_cached(intensity: str,
+                     current_level: float,
+                     target_level: float,
+                     weeks_count: int) -> Tuple[float, Tuple[Tuple[int, float], ...]]:
+    """Compute the weekly improvement and (week, expected_level) schedule for a timeline."""
+    expected_weekly_improvement = (target_level - current_level) * _INTENSITY_FACTORS[intensity]
+    weeks, levels = _timeline(current_level, expected_weekly_improvement, weeks_count)
+    return expected_weekly_improvement, tuple(zip(weeks.tolist(), levels.tolist()))
+
 class SkillRecommender:
     """
     A class to generate personalized skill improvement recommendations
@@ -15,124 +204,7 @@ class SkillRecommender:
     
     def __init__(self):
         """Initialize the recommendation engine with predefined improvement strategies."""
-        self.skill_strategies = {
-            'accuracy': {
-                'beginner': {
-                    'practices': [
-                        "Practice basic aiming drills for 15 minutes daily",
-                        "Focus on stationary target practice",
-                        "Use training maps with larger targets"
-                    ],
-                    'duration': timedelta(weeks=2),
-                    'intensity': 'low'
-                },
-                'intermediate': {
-                    'practices': [
-                        "Practice precision aiming drills for 20 minutes daily",
-                        "Incorporate moving target practice",
-                        "Use aim trainer software for varied scenarios"
-                    ],
-                    'duration': timedelta(weeks=3),
-                    'intensity': 'medium'
-                },
-                'advanced': {
-                    'practices': [
-                        "Practice advanced aiming techniques for 30 minutes daily",
-                        "Focus on flick shots and micro-adjustments",
-                        "Incorporate pressure training scenarios"
-                    ],
-                    'duration': timedelta(weeks=4),
-                    'intensity': 'high'
-                }
-            },
-            'reaction_time': {
-                'beginner': {
-                    'practices': [
-                        "Practice basic reaction exercises for 10 minutes daily",
-                        "Use simple reaction time training tools",
-                        "Focus on consistent timing patterns"
-                    ],
-                    'duration': timedelta(weeks=2),
-                    'intensity': 'low'
-                },
-                'intermediate': {
-                    'practices': [
-                        "Practice varied reaction drills for 20 minutes daily",
-                        "Incorporate multiple stimulus types",
-                        "Use advanced reaction training software"
-                    ],
-                    'duration': timedelta(weeks=3),
-                    'intensity': 'medium'
-                },
-                'advanced': {
-                    'practices': [
-                        "Practice complex reaction scenarios for 25 minutes daily",
-                        "Focus on multi-target acquisition",
-                        "Incorporate decision-making elements"
-                    ],
-                    'duration': timedelta(weeks=4),
-                    'intensity': 'high'
-                }
-            },
-            'decision_making': {
-                'beginner': {
-                    'practices': [
-                        "Review gameplay recordings for 15 minutes daily",
-                        "Practice basic strategy scenarios",
-                        "Focus on fundamental decision trees"
-                    ],
-                    'duration': timedelta(weeks=2),
-                    'intensity': 'low'
-                },
-                'intermediate': {
-                    'practices': [
-                        "Analyze pro gameplay videos for 20 minutes daily",
-                        "Practice situational awareness exercises",
-                        "Participate in structured scrimmages"
-                    ],
-                    'duration': timedelta(weeks=3),
-                    'intensity': 'medium'
-                },
-                'advanced': {
-                    'practices': [
-                        "Study advanced tactics for 30 minutes daily",
-                        "Practice complex decision-making scenarios",
-                        "Lead team strategy sessions"
-                    ],
-                    'duration': timedelta(weeks=4),
-                    'intensity': 'high'
-                }
-            },
-            'teamwork': {
-                'beginner': {
-                    'practices': [
-                        "Practice basic communication drills",
-                        "Focus on role-specific responsibilities",
-                        "Participate in casual team games"
-                    ],
-                    'duration': timedelta(weeks=2),
-                    'intensity': 'low'
-                },
-                'intermediate': {
-                    'practices': [
-                        "Practice advanced communication strategies",
-                        "Focus on team coordination exercises",
-                        "Participate in organized team practice"
-                    ],
-                    'duration': timedelta(weeks=3),
-                    'intensity': 'medium'
-                },
-                'advanced': {
-                    'practices': [
-                        "Lead team coordination drills",
-                        "Develop and execute team strategies",
-                        "Organize scrimmage sessions"
-                    ],
-                    'duration': timedelta(weeks=4),
-                    'intensity': 'high'
-                }
-            }
-        }
+        self.skill_strategies = _SKILL_STRATEGIES
         logger.info("Skill Recommender initialized with predefined strategies")
 
     def determine_skill_level(self, metric_value: float, metric_type: str) -> str:
@@ -146,28 +218,26 @@ class SkillRecommender:
         Returns:
             str: Skill level classification
         """
-        # Metric-specific thresholds
-        thresholds = {
-            'accuracy': {'beginner': 60, 'intermediate': 80},
-            'reaction_time': {'beginner': 300, 'intermediate': 200},  # ms
-            'decision_making': {'beginner': 65, 'intermediate': 85},
-            'teamwork': {'beginner': 70, 'intermediate': 85}
-        }
+        return _SKILL_LEVEL_NAMES[self._skill_level(metric_value, _METRIC_BY_NAME.get(metric_type))]
+
+    def _skill_level(self, metric_value: float, metric: Optional[Metric]) -> SkillLevel:
+        """
+        Determine the skill level index based on metric value.
+        
+        Args:
+            metric_value (float): Current value of the performance metric
+            metric (Metric, optional): Metric being evaluated, None for unknown metrics
+            
+        Returns:
+            SkillLevel: Skill level classification
+        """
+        if metric is None:
+            return _SKILL_LEVELS[int(np.searchsorted(_DEFAULT_THRESHOLDS, metric_value, side='right'))]
         
-        metric_thresholds = thresholds.get(metric_type, {'beginner': 50, 'intermediate': 75})
+        # Lower-is-better metrics are negated so one ascending lookup covers both cases
+        value = -metric_value if metric == Metric.REACTION_TIME else metric_value
         
-        if metric_type == 'reaction_time':  # Lower is better
-            if metric_value > metric_thresholds['beginner']:
-                return 'beginner'
-            elif metric_value > metric_thresholds['intermediate']:
-                return 'intermediate'
-            return 'advanced'
-        else:  # Higher is better
-            if metric_value < metric_thresholds['beginner']:
-                return 'beginner'
-            elif metric_value < metric_thresholds['intermediate']:
-                return 'intermediate'
-            return 'advanced'
+        return _SKILL_LEVELS[int(np.searchsorted(_THRESHOLD_TABLE[metric], value, side='right'))]
 
     def generate_recommendations(self, 
                               analysis_results: Dict,
@@ -182,37 +252,70 @@ class SkillRecommender:
         Returns:
             List[Dict]: List of personalized recommendations
         """
-        recommendations = []
+        # Gather the fields needed for ranking into parallel arrays
+        metrics = list(analysis_results)
+        count = len(metrics)
+        improvement = [analysis_results[metric]['improvement_analysis'] for metric in metrics]
         
-        for metric, analysis in analysis_results.items():
-            if analysis['improvement_analysis']['needs_improvement']:
-                current_level = analysis['current_stats']['mean']
-                skill_level = self.determine_skill_level(current_level, metric)
-                
-                # Get appropriate strategies
-                if metric in self.skill_strategies:
-                    strategy = self.skill_strategies[metric][skill_level]
-                    
-                    recommendation = {
-                        'metric': metric,
-                        'current_level': current_level,
-                        'skill_level': skill_level,
-                        'target_level': analysis['improvement_analysis']['suggested_target'],
-                        'practices': strategy['practices'],
-                        'duration': strategy['duration'].days,
-                        'intensity': strategy['intensity'],
-                        'priority': 'high' if analysis['improvement_analysis']['z_score'] < -2 else 'medium'
-                    }
-                    
-                    recommendations.append(recommendation)
+        needs_improvement = np.fromiter(
+            (analysis['needs_improvement'] for analysis in improvement),
+            dtype=bool,
+            count=count
+        )
+        current_levels = np.fromiter(
+            (analysis_results[metric]['current_stats']['mean'] for metric in metrics),
+            dtype=np.float64,
+            count=count
+        )
+        target_levels = np.fromiter(
+            (analysis['suggested_target'] for analysis in improvement),
+            dtype=np.float64,
+            count=count
+        )
+        z_scores = np.fromiter(
+            (analysis['z_score'] for analysis in improvement),
+            dtype=np.float64,
+            count=count
+        )
         
-        # Sort by priority and expected improvement impact
-        recommendations.sort(key=lambda x: (
-            x['priority'] == 'high',
-            abs(x['target_level'] - x['current_level'])
-        ), reverse=True)
+        # Precompute numeric sort keys once instead of comparing labels
+        is_high = z_scores < -2
+        improvement_gaps = np.abs(target_levels - current_levels)
         
-        logger.info(f"Generated {len(recommendations)} skill improvement recommendations")
+        # Sort by priority and expected improvement impact (stable, descending)
+        order = np.lexsort((-improvement_gaps, ~is_high))
+        order = order[needs_improvement[order]]
+        
+        current_levels = current_levels.tolist()
+        target_levels = target_levels.tolist()
+        is_high = is_high.tolist()
+        recommendations = []
+        
+        for i in order.tolist():
+            # Only metrics with template strategies get recommendations
+            metric = _METRIC_BY_NAME.get(metrics[i])
+            if metric is None:
+                continue
+            
+            current_level = current_levels[i]
+            skill_level = self._skill_level(current_level, metric)
+            strategy = _STRATEGY_TABLE[metric][skill_level]
+            
+            recommendation = {
+                'metric': metrics[i],
+                'current_level': current_level,
+                'skill_level': _SKILL_LEVEL_NAMES[skill_level],
+                'target_level': target_levels[i],
+                'practices': strategy['practices'],
+                'duration': strategy['duration'].days,
+                'weeks': strategy['weeks'],
+                'intensity': strategy['intensity'],
+                'priority': 'high' if is_high[i] else 'medium'
+            }
+            
+            recommendations.append(recommendation)
+        
+        logger.info("Generated %d skill improvement recommendations", len(recommendations))
         return recommendations
 
     def estimate_improvement_timeline(self, 
@@ -228,27 +331,27 @@ class SkillRecommender:
         Returns:
             Dict: Timeline estimation and milestones
         """
-        base_improvement = {
-            'low': 0.1,
-            'medium': 0.15,
-            'high': 0.2
-        }
+        # Recommendations built elsewhere may only carry the duration in days
+        weeks = recommendation.get('weeks')
+        if weeks is None:
+            weeks = recommendation['duration'] // 7
         
-        intensity_factor = base_improvement[recommendation['intensity']]
-        expected_weekly_improvement = (
-            recommendation['target_level'] - recommendation['current_level']
-        ) * intensity_factor
+        # Timelines depend only on these inputs, so repeated requests hit the cache
+        expected_weekly_improvement, schedule = _timeline_cached(
+            recommendation['intensity'],
+            float(recommendation['current_level']),
+            float(recommendation['target_level']),
+            weeks
+        )
         
-        milestones = []
-        current = recommendation['current_level']
-        
-        for week in range(1, recommendation['duration'] // 7 + 1):
-            current += expected_weekly_improvement
-            milestones.append({
+        milestones = [
+            {
                 'week': week,
-                'expected_level': current,
+                'expected_level': level,
                 'improvement': expected_weekly_improvement
-            })
+            }
+            for week, level in schedule
+        ]
         
         return {
             'total_duration_days': recommendation['duration'],
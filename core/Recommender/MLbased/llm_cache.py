@@ -0,0 +1,139 @@
+# llm_cache.py
+
+from collections import OrderedDict
+from typing import Dict, Optional
+import hashlib
+import logging
+import json
+import os
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.arcadia', 'cache')
+
+# Responses kept in memory before the least recently used is evicted
+DEFAULT_MEMORY_SIZE = 1024
+
+def _client_setting(llm_client, name: str, default=None):
+    """Read a setting from an LLM client object or a plain config dict."""
+    if isinstance(llm_client, dict):
+        return llm_client.get(name, default)
+    return getattr(llm_client, name, default)
+
+def _dumps_sorted(payload: Dict) -> bytes:
+    """Serialize compactly with sorted keys; both backends produce identical bytes."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode()
+
+def make_cache_key(prompt: str, llm_client) -> str:
+    """
+    Build a deterministic cache key for a prompt sent to a given model.
+
+    Args:
+        prompt (str): Prompt sent to the LLM
+        llm_client: LLM client or config dict; its ``model`` is part of the key
+
+    Returns:
+        str: SHA-256 hex digest of the prompt and model
+    """
+    payload = _dumps_sorted(
+        {'prompt': prompt, 'model': _client_setting(llm_client, 'model', '')}
+    )
+    return hashlib.sha256(payload).hexdigest()
+
+def is_cacheable(llm_client) -> bool:
+    """
+    Check whether responses from an LLM client are deterministic enough to cache.
+
+    Args:
+        llm_client: LLM client or config dict
+
+    Returns:
+        bool: True if the client is configured with temperature 0
+    """
+    return _client_setting(llm_client, 'temperature') == 0
+
+class LLMCache:
+    """
+    A keyed store for LLM responses, held in memory and optionally on disk.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_memory_items: int = DEFAULT_MEMORY_SIZE):
+        """
+        Initialize the response cache.
+
+        Args:
+            directory (str, optional): Directory for a persistent diskcache backend
+                (e.g. DEFAULT_CACHE_DIR); None keeps responses in memory only
+            max_memory_items (int): Responses kept in memory; the least recently
+                used are evicted beyond this (they stay on disk if it is enabled)
+        """
+        self._memory: 'OrderedDict[str, str]' = OrderedDict()
+        self.max_memory_items = max_memory_items
+        self._disk = None
+        self.stats = {'hits': 0, 'misses': 0}
+
+        if directory is not None:
+            try:
+                import diskcache
+                self._disk = diskcache.Cache(directory)
+            except ImportError:
+                logger.warning("diskcache is not installed; using in-memory LLM cache only")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): Cache key from make_cache_key
+
+        Returns:
+            str, optional: Cached response, or None on a miss
+        """
+        response = self._memory.get(key)
+        if response is not None:
+            self._memory.move_to_end(key)
+        elif self._disk is not None:
+            response = self._disk.get(key)
+            if response is not None:
+                self._remember(key, response)
+
+        if response is None:
+            self.stats['misses'] += 1
+        else:
+            self.stats['hits'] += 1
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("LLM cache hit rate: %.1f%%", self.hit_rate * 100)
+        return response
+
+    def set(self, key: str, response: str) -> None:
+        """
+        Store a response.
+
+        Args:
+            key (str): Cache key from make_cache_key
+            response (str): Raw response from LLM
+        """
+        self._remember(key, response)
+        if self._disk is not None:
+            self._disk.set(key, response)
+
+    def _remember(self, key: str, response: str) -> None:
+        """Keep a response in memory, evicting the least recently used beyond the limit."""
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups served from the cache."""
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
@@ -0,0 +1,102 @@
+# llm_json.py
+
+from typing import Any, Iterable, Tuple
+import logging
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either
+_loads = orjson.loads if orjson is not None else json.loads
+
+def _strip_code_fences(text: str) -> str:
+    """Remove a surrounding markdown code fence (```json ... ```) if present."""
+    text = text.strip()
+    if text.startswith('```'):
+        text = text.split('\n', 1)[1] if '\n' in text else ''
+        if text.rstrip().endswith('```'):
+            text = text.rstrip()[:-3]
+    return text
+
+def _extract_json_block(text: str) -> str:
+    """Return the span from the first opening bracket to its last matching closer."""
+    starts = [index for index in (text.find('{'), text.find('[')) if index != -1]
+    if not starts:
+        return text
+
+    start = min(starts)
+    end = text.rfind('}' if text[start] == '{' else ']')
+    return text[start:end + 1] if end > start else text
+
+def robust_json_parse(text: str) -> Any:
+    """
+    Parse JSON from an LLM response, repairing common formatting problems.
+
+    Strict parsing is tried first; on failure, markdown fences and surrounding
+    prose are stripped, and as a last resort the lenient (and much slower)
+    json5 parser is used if it is installed.
+
+    Args:
+        text (str): Raw response from LLM
+
+    Returns:
+        Any: Parsed JSON value
+
+    Raises:
+        ValueError: If the response cannot be parsed
+    """
+    try:
+        return _loads(text)
+    except json.JSONDecodeError as error:
+        strict_error = error
+
+    candidate = _extract_json_block(_strip_code_fences(text))
+    try:
+        return _loads(candidate)
+    except json.JSONDecodeError:
+        pass
+
+    try:
+        import json5
+    except ImportError:
+        raise strict_error
+
+    logger.debug("Falling back to json5 to parse LLM response")
+    return json5.loads(candidate)
+
+def read_json_stream(chunks: Iterable[str]) -> Tuple[str, Any]:
+    """
+    Consume a streamed LLM response until it holds one complete JSON value.
+
+    Chunks are buffered in a list and only joined and parsed when the latest
+    chunk ends in a closing bracket, avoiding a re-parse of the whole buffer
+    on every token. Reading stops at the first complete value.
+
+    Args:
+        chunks (Iterable[str]): Text chunks of the response, in order
+
+    Returns:
+        Tuple[str, Any]: Text consumed so far and the parsed JSON value
+
+    Raises:
+        ValueError: If the stream ends without a parseable value
+    """
+    buffer = []
+    for chunk in chunks:
+        buffer.append(chunk)
+        if chunk.rstrip()[-1:] not in ('}', ']'):
+            continue
+
+        text = ''.join(buffer)
+        try:
+            return text, _loads(text)
+        except json.JSONDecodeError:
+            continue
+
+    text = ''.join(buffer)
+    return text, robust_json_parse(text)
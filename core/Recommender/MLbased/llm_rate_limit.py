@@ -0,0 +1,114 @@
+# llm_rate_limit.py
+
+from typing import Awaitable, Callable, Optional
+import asyncio
+import logging
+
+try:
+    from aiolimiter import AsyncLimiter
+except ImportError:  # aiolimiter is optional; requests are then not rate limited
+    AsyncLimiter = None
+
+try:
+    from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+except ImportError:  # tenacity is optional; failed requests are then not retried
+    AsyncRetrying = None
+
+logger = logging.getLogger(__name__)
+
+class _NoLimit:
+    """Async context manager that never waits, used when no rate limit applies."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+def make_limiter(requests_per_minute: Optional[float]):
+    """
+    Create a token-bucket limiter for LLM requests.
+
+    Args:
+        requests_per_minute (float, optional): Provider quota; None disables limiting
+
+    Returns:
+        Async context manager that waits until a request may be sent
+    """
+    if requests_per_minute is None:
+        return _NoLimit()
+    if AsyncLimiter is None:
+        logger.warning("aiolimiter is not installed; LLM requests will not be rate limited")
+        return _NoLimit()
+    return AsyncLimiter(max_rate=requests_per_minute, time_period=60)
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Check whether an LLM client error is a rate limit or server error worth retrying.
+
+    Args:
+        error (BaseException): Exception raised by the LLM client
+
+    Returns:
+        bool: True for HTTP 429 and 5xx responses
+    """
+    status = getattr(error, 'status_code', None) or getattr(error, 'status', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return isinstance(status, int) and (status == 429 or 500 <= status < 600)
+
+async def send_request(llm,
+                       limiter,
+                       prompt: str,
+                       read_stream: Optional[Callable[[str], str]] = None) -> str:
+    """
+    Send one request to the LLM once the rate limiter allows it.
+
+    Async clients are awaited directly; blocking clients run in the default
+    executor so they do not stall the event loop.
+
+    Args:
+        llm: LLM client exposing generate() and optionally agenerate()
+        limiter: Async context manager from make_limiter
+        prompt (str): Prompt to send to the LLM
+        read_stream (Callable, optional): Blocking reader used instead of
+            generate() when the client has ``stream = True``
+
+    Returns:
+        str: Raw response from LLM
+    """
+    async with limiter:
+        agenerate = getattr(llm, 'agenerate', None)
+        if agenerate is not None:
+            return await agenerate(prompt)
+
+        loop = asyncio.get_running_loop()
+        if read_stream is not None and getattr(llm, 'stream', False) is True:
+            return await loop.run_in_executor(None, read_stream, prompt)
+        return await loop.run_in_executor(None, llm.generate, prompt)
+
+async def call_with_retries(request: Callable[[str], Awaitable[str]],
+                            prompt: str,
+                            max_attempts: int = 5) -> str:
+    """
+    Send a request, retrying rate limit and server errors with exponential backoff.
+
+    Args:
+        request (Callable): Coroutine function sending one request for a prompt
+        prompt (str): Prompt to send to the LLM
+        max_attempts (int): Maximum number of attempts, including the first
+
+    Returns:
+        str: Raw response from LLM
+    """
+    if AsyncRetrying is None or max_attempts <= 1:
+        return await request(prompt)
+
+    async for attempt in AsyncRetrying(
+        wait=wait_random_exponential(min=1, max=30),
+        stop=stop_after_attempt(max_attempts),
+        retry=retry_if_exception(is_retryable),
+        reraise=True
+    ):
+        with attempt:
+            return await request(prompt)
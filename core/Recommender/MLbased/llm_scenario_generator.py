@@ -1,67 +1,360 @@
 # llm_scenario_generator.py
 
-from typing import Dict, List
+from typing import Dict, List, Optional
+import asyncio
 import logging
-import json
+import re
+
+from Recommender.MLbased.llm_cache import LLMCache, is_cacheable, make_cache_key
+from Recommender.MLbased.llm_json import read_json_stream, robust_json_parse
+from Recommender.MLbased.llm_rate_limit import call_with_retries, make_limiter, send_request
+from shared_utils import freeze
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Percentage in a success criterion, e.g. the 70 in "Minimum 70% accuracy"
+_ACCURACY_RE = re.compile(r'(\d+)\s*%')
+
+_REQUIRED_SCENARIO_FIELDS = frozenset({
+    'name', 'description', 'duration_minutes',
+    'success_criteria', 'difficulty'
+})
+
+# Prompt templates; literal JSON braces are doubled for str.format_map
+_SCENARIO_PROMPT_TEMPLATE = """As a gaming coach, create 3 practice scenarios to improve {metric} skill.
+Current level: {current_level:.1f}
+Target level: {target_level:.1f}
+Practice routine: {practice_routine}
+
+Create scenarios that:
+1. Are specific and measurable
+2. Have clear success criteria
+3. Can be completed in 5-10 minutes
+4. Progress in difficulty
+
+Format your response as a JSON array of scenarios, where each scenario has:
+{{
+    "name": str,
+    "description": str,
+    "duration_minutes": int,
+    "success_criteria": str,
+    "difficulty": "beginner" | "intermediate" | "advanced"
+}}"""
+
+_BATCHED_SCENARIO_PROMPT_TEMPLATE = """As a gaming coach, create 3 practice scenarios for each of the following skills.
+
+{recommendation_details}
+
+Create scenarios that:
+1. Are specific and measurable
+2. Have clear success criteria
+3. Can be completed in 5-10 minutes
+4. Progress in difficulty
+
+Format your response as a JSON object with one entry per numbered skill:
+{{
+    "results": [
+        {{"metric": str, "scenarios": [scenario, ...]}}
+    ]
+}}
+where each scenario has:
+{{
+    "name": str,
+    "description": str,
+    "duration_minutes": int,
+    "success_criteria": str,
+    "difficulty": "beginner" | "intermediate" | "advanced"
+}}"""
+
+# Scenarios used when the LLM fails, built once at import and shared read-only
+_FALLBACK_SCENARIOS = freeze({
+    'accuracy': [
+        {
+            'name': 'Basic Target Practice',
+            'description': 'Hit 10 stationary targets within 45 seconds',
+            'duration_minutes': 5,
+            'success_criteria': 'Minimum 70% accuracy',
+            'difficulty': 'beginner'
+        },
+        {
+            'name': 'Moving Target Training',
+            'description': 'Hit 15 moving targets within 30 seconds',
+            'duration_minutes': 5,
+            'success_criteria': 'Minimum 75% accuracy',
+            'difficulty': 'intermediate'
+        }
+    ],
+    'reaction_time': [
+        {
+            'name': 'Quick Response Training',
+            'description': 'React to 20 visual cues as quickly as possible',
+            'duration_minutes': 5,
+            'success_criteria': 'Average reaction time under 300ms',
+            'difficulty': 'beginner'
+        },
+        {
+            'name': 'Multi-Target Reactions',
+            'description': 'React to multiple targets in sequence',
+            'duration_minutes': 5,
+            'success_criteria': 'Average reaction time under 250ms',
+            'difficulty': 'intermediate'
+        }
+    ],
+    'decision_making': [
+        {
+            'name': 'Basic Decision Challenge',
+            'description': 'Make correct decisions in simple game situations',
+            'duration_minutes': 10,
+            'success_criteria': '7/10 correct decisions',
+            'difficulty': 'beginner'
+        },
+        {
+            'name': 'Tactical Choices',
+            'description': 'Choose optimal strategies in complex situations',
+            'duration_minutes': 10,
+            'success_criteria': '8/10 optimal choices',
+            'difficulty': 'intermediate'
+        }
+    ],
+    'teamwork': [
+        {
+            'name': 'Communication Practice',
+            'description': 'Practice clear and efficient team communication',
+            'duration_minutes': 10,
+            'success_criteria': '80% communication accuracy',
+            'difficulty': 'beginner'
+        },
+        {
+            'name': 'Team Coordination',
+            'description': 'Execute coordinated team movements and actions',
+            'duration_minutes': 10,
+            'success_criteria': '85% successful coordination',
+            'difficulty': 'intermediate'
+        }
+    ]
+})
+
 class LLMScenarioGenerator:
     """
     A class that uses LLM to generate practice scenarios for gaming skill improvement.
     """
     
-    def __init__(self, llm_client):
+    def __init__(self,
+                 llm_client,
+                 max_concurrency: int = 8,
+                 batch_size: Optional[int] = None,
+                 cache: Optional[LLMCache] = None,
+                 requests_per_minute: Optional[float] = None,
+                 max_attempts: int = 5):
         """
         Initialize the LLM-based scenario generator.
         
         Args:
-            llm_client: An initialized LLM client (e.g., OpenAI, Anthropic)
+            llm_client: An initialized LLM client (e.g., OpenAI, Anthropic). Clients
+                exposing an async ``agenerate`` are awaited directly; otherwise the
+                blocking ``generate`` runs in the default executor. Clients with
+                ``stream = True`` are read with ``generate(prompt, stream=True)``
+                and stop as soon as the response holds complete JSON.
+            max_concurrency (int): Maximum number of LLM requests in flight at once
+            batch_size (int, optional): Maximum recommendations combined into one
+                prompt; None sends all recommendations in a single request
+            cache (LLMCache, optional): Response cache, used only when the client
+                is configured with temperature 0; defaults to an in-memory cache
+            requests_per_minute (float, optional): Provider quota enforced with a
+                token bucket; None sends requests as soon as a slot is free
+            max_attempts (int): Attempts per request when the provider answers
+                with a rate limit or server error, backing off exponentially
         """
         self.llm = llm_client
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.cache = cache if cache is not None else LLMCache()
+        self.max_attempts = max_attempts
+        self._limiter = make_limiter(requests_per_minute)
 
     def generate_scenarios(self, recommendations: List[Dict]) -> List[Dict]:
         """
         Generate practice scenarios using LLM based on recommendations.
         
+        Synchronous wrapper around agenerate_scenarios; use the async method
+        directly from within a running event loop.
+        
         Args:
             recommendations (List[Dict]): Skill improvement recommendations
             
         Returns:
             List[Dict]: Practice scenarios for each skill
         """
-        scenarios = []
+        return asyncio.run(self.agenerate_scenarios(recommendations))
+
+    async def agenerate_scenarios(self, recommendations: List[Dict]) -> List[Dict]:
+        """
+        Generate practice scenarios using LLM, batching recommendations into
+        as few prompts as possible and issuing the batches concurrently.
         
-        for rec in recommendations:
-            # Create prompt for scenario generation
-            prompt = self._create_scenario_prompt(rec)
-            
-            try:
-                # Get LLM response
-                response = self.llm.generate(prompt)
-                
-                # Parse and validate scenarios
-                parsed_scenarios = self._parse_scenarios(response)
-                
-                if parsed_scenarios:
-                    scenarios.append({
-                        'metric': rec['metric'],
-                        'scenarios': parsed_scenarios
-                    })
-                    
-            except Exception as e:
-                logger.error(f"Error generating scenarios for {rec['metric']}: {str(e)}")
-                # Use fallback scenarios if LLM fails
-                fallback = self._get_fallback_scenarios(rec)
-                scenarios.append({
-                    'metric': rec['metric'],
-                    'scenarios': fallback
-                })
+        Args:
+            recommendations (List[Dict]): Skill improvement recommendations
+            
+        Returns:
+            List[Dict]: Practice scenarios for each skill
+        """
+        batch_size = self.batch_size or max(len(recommendations), 1)
+        batches = [
+            recommendations[i:i + batch_size]
+            for i in range(0, len(recommendations), batch_size)
+        ]
+        
+        # Get LLM responses concurrently, bounded by max_concurrency
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(
+            *(self._agenerate_batch(batch, semaphore) for batch in batches)
+        )
+        
+        scenarios = [entry for batch_scenarios in results for entry in batch_scenarios]
         
-        logger.info(f"Generated scenarios for {len(scenarios)} skills")
+        logger.info("Generated scenarios for %d skills", len(scenarios))
         return scenarios
 
+    async def _agenerate_batch(self,
+                               recommendations: List[Dict],
+                               semaphore: asyncio.Semaphore) -> List[Dict]:
+        """
+        Generate scenarios for a batch of recommendations with a single prompt.
+        
+        Falls back to one request per recommendation if the batched response
+        is malformed, and to template scenarios if the request itself fails.
+        
+        Args:
+            recommendations (List[Dict]): Skill improvement recommendations
+            semaphore (asyncio.Semaphore): Limits the number of concurrent requests
+            
+        Returns:
+            List[Dict]: Practice scenarios for each skill in the batch
+        """
+        prompt = self._create_batched_scenario_prompt(recommendations)
+        
+        try:
+            response = await self._agenerate(prompt, semaphore)
+        except Exception as e:
+            logger.error("Error generating batched scenarios: %s", e)
+            return [self._fallback_entry(rec) for rec in recommendations]
+        
+        try:
+            return self._parse_batched_scenarios(response, recommendations)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(
+                "Malformed batched response (%s), retrying %d recommendations individually",
+                e, len(recommendations)
+            )
+        
+        results = await asyncio.gather(
+            *(self._agenerate_single(rec, semaphore) for rec in recommendations)
+        )
+        return [entry for entry in results if entry is not None]
+
+    async def _agenerate_single(self,
+                                recommendation: Dict,
+                                semaphore: asyncio.Semaphore) -> Optional[Dict]:
+        """
+        Generate scenarios for a single recommendation.
+        
+        Args:
+            recommendation (Dict): Skill improvement recommendation
+            semaphore (asyncio.Semaphore): Limits the number of concurrent requests
+            
+        Returns:
+            Dict, optional: Scenarios for the skill, or None if none were valid
+        """
+        # Create prompt for scenario generation
+        prompt = self._create_scenario_prompt(recommendation)
+        
+        try:
+            # Get LLM response
+            response = await self._agenerate(prompt, semaphore)
+            
+            # Parse and validate scenarios
+            parsed_scenarios = self._parse_scenarios(response)
+            
+            if parsed_scenarios:
+                return {
+                    'metric': recommendation['metric'],
+                    'scenarios': parsed_scenarios
+                }
+            return None
+            
+        except Exception as e:
+            logger.error("Error generating scenarios for %s: %s", recommendation['metric'], e)
+            # Use fallback scenarios if LLM fails
+            return self._fallback_entry(recommendation)
+
+    def _fallback_entry(self, recommendation: Dict) -> Dict:
+        """
+        Build a scenario entry from the fallback templates.
+        
+        Args:
+            recommendation (Dict): Skill improvement recommendation
+            
+        Returns:
+            Dict: Fallback scenarios for the skill
+        """
+        return {
+            'metric': recommendation['metric'],
+            'scenarios': self._get_fallback_scenarios(recommendation)
+        }
+
+    async def _agenerate(self, prompt: str, semaphore: asyncio.Semaphore) -> str:
+        """
+        Get a single LLM response without blocking the event loop.
+        
+        Responses from deterministic clients are served from the cache
+        when the same prompt has been seen before. Requests are bounded by
+        the semaphore (in flight) and the rate limiter (per minute).
+        
+        Args:
+            prompt (str): Prompt to send to the LLM
+            semaphore (asyncio.Semaphore): Limits the number of concurrent requests
+            
+        Returns:
+            str: Raw response from LLM
+        """
+        key = make_cache_key(prompt, self.llm) if is_cacheable(self.llm) else None
+        if key is not None:
+            response = self.cache.get(key)
+            if response is not None:
+                return response
+        
+        async with semaphore:
+            response = await call_with_retries(self._request, prompt, self.max_attempts)
+        
+        if key is not None:
+            self.cache.set(key, response)
+        return response
+
+    async def _request(self, prompt: str) -> str:
+        """
+        Send one request to the LLM once the rate limiter allows it.
+        
+        Args:
+            prompt (str): Prompt to send to the LLM
+            
+        Returns:
+            str: Raw response from LLM
+        """
+        return await send_request(self.llm, self._limiter, prompt, self._read_stream)
+
+    def _read_stream(self, prompt: str) -> str:
+        """
+        Read a streamed LLM response up to the end of its JSON payload.
+        
+        Args:
+            prompt (str): Prompt to send to the LLM
+            
+        Returns:
+            str: Response text up to the first complete JSON value
+        """
+        response, _ = read_json_stream(self.llm.generate(prompt, stream=True))
+        return response
+
     def _create_scenario_prompt(self, recommendation: Dict) -> str:
         """
         Create a prompt for the LLM to generate practice scenarios.
@@ -72,31 +365,33 @@ class LLMScenarioGenerator:
         Returns:
             str: Formatted prompt
         """
-        prompt = """As a gaming coach, create 3 practice scenarios to improve {metric} skill.
-Current level: {current_level:.1f}
-Target level: {target_level:.1f}
-Practice routine: {practice_routine}
-
-Create scenarios that:
-1. Are specific and measurable
-2. Have clear success criteria
-3. Can be completed in 5-10 minutes
-4. Progress in difficulty
-
-Format your response as a JSON array of scenarios, where each scenario has:
-{
-    "name": str,
-    "description": str,
-    "duration_minutes": int,
-    "success_criteria": str,
-    "difficulty": "beginner" | "intermediate" | "advanced"
-}"""
+        return _SCENARIO_PROMPT_TEMPLATE.format_map({
+            'metric': recommendation['metric'],
+            'current_level': recommendation.get('current_level', 0),
+            'target_level': recommendation.get('target_level', 0),
+            'practice_routine': recommendation.get('practice_routine', 'daily practice')
+        })
 
-        return prompt.format(
-            metric=recommendation['metric'],
-            current_level=recommendation.get('current_level', 0),
-            target_level=recommendation.get('target_level', 0),
-            practice_routine=recommendation.get('practice_routine', 'daily practice')
+    def _create_batched_scenario_prompt(self, recommendations: List[Dict]) -> str:
+        """
+        Create a single prompt asking for scenarios for several recommendations.
+        
+        Args:
+            recommendations (List[Dict]): Skill improvement recommendations
+            
+        Returns:
+            str: Formatted prompt
+        """
+        recommendation_details = "\n".join(
+            f"[{i}] {rec['metric']}: "
+            f"current level {rec.get('current_level', 0):.1f}, "
+            f"target level {rec.get('target_level', 0):.1f}, "
+            f"practice routine: {rec.get('practice_routine', 'daily practice')}"
+            for i, rec in enumerate(recommendations, 1)
+        )
+        
+        return _BATCHED_SCENARIO_PROMPT_TEMPLATE.format_map(
+            {'recommendation_details': recommendation_details}
         )
 
     def _parse_scenarios(self, llm_response: str) -> List[Dict]:
@@ -111,25 +406,71 @@ Format your response as a JSON array of scenarios, where each scenario has:
         """
         try:
             # Extract JSON from response
-            scenarios = json.loads(llm_response)
-            
-            # Validate required fields
-            required_fields = {
-                'name', 'description', 'duration_minutes',
-                'success_criteria', 'difficulty'
-            }
+            scenarios = robust_json_parse(llm_response)
             
-            validated_scenarios = []
-            for scenario in scenarios:
-                if all(field in scenario for field in required_fields):
-                    validated_scenarios.append(scenario)
+            return self._validate_scenarios(scenarios)
             
-            return validated_scenarios
-            
-        except json.JSONDecodeError:
+        except ValueError:
             logger.error("Failed to parse LLM response as JSON")
             return []
 
+    def _parse_batched_scenarios(self,
+                                 llm_response: str,
+                                 recommendations: List[Dict]) -> List[Dict]:
+        """
+        Parse and validate a batched LLM response.
+        
+        Args:
+            llm_response (str): Raw response from LLM
+            recommendations (List[Dict]): Recommendations included in the prompt
+            
+        Returns:
+            List[Dict]: Scenarios for each skill with at least one valid scenario
+            
+        Raises:
+            ValueError: If the response is not a JSON object with a results list
+        """
+        data = robust_json_parse(llm_response)
+        if not isinstance(data, dict) or not isinstance(data.get('results'), list):
+            raise ValueError("Batched response is missing a 'results' list")
+        
+        scenarios_by_metric = {
+            entry['metric']: entry.get('scenarios', [])
+            for entry in data['results']
+            if isinstance(entry, dict) and 'metric' in entry
+        }
+        
+        scenarios = []
+        for rec in recommendations:
+            parsed_scenarios = self._validate_scenarios(
+                scenarios_by_metric.get(rec['metric'], [])
+            )
+            if parsed_scenarios:
+                scenarios.append({
+                    'metric': rec['metric'],
+                    'scenarios': parsed_scenarios
+                })
+        
+        return scenarios
+
+    def _validate_scenarios(self, scenarios: List[Dict]) -> List[Dict]:
+        """
+        Keep only scenarios that contain all required fields.
+        
+        Args:
+            scenarios (List[Dict]): Scenarios parsed from an LLM response
+            
+        Returns:
+            List[Dict]: Validated scenarios
+        """
+        # Validate required fields
+        validated_scenarios = []
+        for scenario in scenarios:
+            if _REQUIRED_SCENARIO_FIELDS.issubset(scenario):
+                validated_scenarios.append(scenario)
+        
+        return validated_scenarios
+
     def _get_fallback_scenarios(self, recommendation: Dict) -> List[Dict]:
         """
         Provide basic fallback scenarios if LLM fails.
@@ -140,74 +481,10 @@ Format your response as a JSON array of scenarios, where each scenario has:
         Returns:
             List[Dict]: Basic scenarios
         """
-        fallback_templates = {
-            'accuracy': [
-                {
-                    'name': 'Basic Target Practice',
-                    'description': 'Hit 10 stationary targets within 45 seconds',
-                    'duration_minutes': 5,
-                    'success_criteria': 'Minimum 70% accuracy',
-                    'difficulty': 'beginner'
-                },
-                {
-                    'name': 'Moving Target Training',
-                    'description': 'Hit 15 moving targets within 30 seconds',
-                    'duration_minutes': 5,
-                    'success_criteria': 'Minimum 75% accuracy',
-                    'difficulty': 'intermediate'
-                }
-            ],
-            'reaction_time': [
-                {
-                    'name': 'Quick Response Training',
-                    'description': 'React to 20 visual cues as quickly as possible',
-                    'duration_minutes': 5,
-                    'success_criteria': 'Average reaction time under 300ms',
-                    'difficulty': 'beginner'
-                },
-                {
-                    'name': 'Multi-Target Reactions',
-                    'description': 'React to multiple targets in sequence',
-                    'duration_minutes': 5,
-                    'success_criteria': 'Average reaction time under 250ms',
-                    'difficulty': 'intermediate'
-                }
-            ],
-            'decision_making': [
-                {
-                    'name': 'Basic Decision Challenge',
-                    'description': 'Make correct decisions in simple game situations',
-                    'duration_minutes': 10,
-                    'success_criteria': '7/10 correct decisions',
-                    'difficulty': 'beginner'
-                },
-                {
-                    'name': 'Tactical Choices',
-                    'description': 'Choose optimal strategies in complex situations',
-                    'duration_minutes': 10,
-                    'success_criteria': '8/10 optimal choices',
-                    'difficulty': 'intermediate'
-                }
-            ],
-            'teamwork': [
-                {
-                    'name': 'Communication Practice',
-                    'description': 'Practice clear and efficient team communication',
-                    'duration_minutes': 10,
-                    'success_criteria': '80% communication accuracy',
-                    'difficulty': 'beginner'
-                },
-                {
-                    'name': 'Team Coordination',
-                    'description': 'Execute coordinated team movements and actions',
-                    'duration_minutes': 10,
-                    'success_criteria': '85% successful coordination',
-                    'difficulty': 'intermediate'
-                }
-            ]
-        }
+        scenarios = _FALLBACK_SCENARIOS.get(recommendation['metric'], _FALLBACK_SCENARIOS['accuracy'])
         
-        return fallback_templates.get(recommendation['metric'], fallback_templates['accuracy'])
+        # Templates are shared and read-only; hand out plain dicts
+        return [dict(scenario) for scenario in scenarios]
 
     def adjust_difficulty(self, scenario: Dict, player_level: float) -> Dict:
         """
@@ -220,24 +497,51 @@ Format your response as a JSON array of scenarios, where each scenario has:
         Returns:
             Dict: Adjusted scenario
         """
-        adjusted = scenario.copy()
+        duration = scenario['duration_minutes']
+        success_criteria = scenario['success_criteria']
         
         # Adjust duration based on level
         if player_level < 50:  # Beginner
-            adjusted['duration_minutes'] = min(adjusted['duration_minutes'] * 1.5, 15)
+            duration = min(duration * 1.5, 15)
         elif player_level > 80:  # Advanced
-            adjusted['duration_minutes'] = max(adjusted['duration_minutes'] * 0.8, 5)
-        
-        # Adjust success criteria
-        if 'accuracy' in adjusted['success_criteria']:
-            current_accuracy = int(''.join(filter(str.isdigit, adjusted['success_criteria'])))
-            if player_level < 50:
-                current_accuracy = max(current_accuracy - 10, 60)
-            elif player_level > 80:
-                current_accuracy = min(current_accuracy + 10, 95)
-            adjusted['success_criteria'] = adjusted['success_criteria'].replace(
-                str(current_accuracy),
-                str(current_accuracy)
-            )
+            duration = max(duration * 0.8, 5)
+        
+        # Adjust the accuracy target in the success criteria
+        if 'accuracy' in success_criteria:
+            match = _ACCURACY_RE.search(success_criteria)
+            if match is not None:
+                current_accuracy = int(match.group(1))
+                if player_level < 50:
+                    current_accuracy = max(current_accuracy - 10, 60)
+                elif player_level > 80:
+                    current_accuracy = min(current_accuracy + 10, 95)
+                success_criteria = (
+                    success_criteria[:match.start(1)]
+                    + str(current_accuracy)
+                    + success_criteria[match.end(1):]
+                )
         
-        return adjusted
\ No newline at end of file
+        return {
+            **scenario,
+            'duration_minutes': duration,
+            'success_criteria': success_criteria
+        }
+
+    def adjust_difficulty_batch(self,
+                                scenarios: List[Dict],
+                                player_levels: List[float]) -> List[Dict]:
+        """
+        Adjust the difficulty of several scenarios in one pass.
+        
+        Args:
+            scenarios (List[Dict]): Practice scenarios
+            player_levels (List[float]): Player's skill level for each scenario
+            
+        Returns:
+            List[Dict]: Adjusted scenarios, in input order
+        """
+        adjust = self.adjust_difficulty
+        return [
+            adjust(scenario, player_level)
+            for scenario, player_level in zip(scenarios, player_levels)
+        ]
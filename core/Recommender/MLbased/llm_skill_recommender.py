@@ -1,30 +1,116 @@
 # llm_skill_recommender.py
 
-from typing import Dict, List
+from typing import Dict, List, Optional
+import asyncio
 import logging
-import json
 
-logging.basicConfig(level=logging.INFO)
+from Recommender.MLbased.llm_cache import LLMCache, is_cacheable, make_cache_key
+from Recommender.MLbased.llm_json import robust_json_parse
+from Recommender.MLbased.llm_rate_limit import call_with_retries, make_limiter, send_request
+from shared_utils import freeze
+
 logger = logging.getLogger(__name__)
 
+_REQUIRED_RECOMMENDATION_FIELDS = frozenset({
+    'metric', 'practice_routine', 'daily_duration', 'goals', 'tips'
+})
+
+# Prompt template; literal JSON braces are doubled for str.format_map
+_RECOMMENDATION_PROMPT_TEMPLATE = """As a professional gaming coach, provide specific practice recommendations for a player who needs to improve in the following areas:
+
+{metrics_details}
+
+For each metric that needs improvement, provide:
+1. A clear practice routine (what to practice and how long)
+2. Specific goals to aim for
+3. Tips for effective practice
+
+Format your response as a JSON object with the following structure for each metric:
+{{
+    "metric": str,
+    "practice_routine": str,
+    "daily_duration": int (in minutes),
+    "goals": str,
+    "tips": list[str]
+}}"""
+
+# Recommendations used when the LLM fails, built once at import and shared read-only
+_FALLBACK_RECOMMENDATIONS = freeze({
+    'accuracy': {
+        'practice_routine': 'Practice aiming drills daily',
+        'daily_duration': 20,
+        'goals': 'Improve accuracy by 10% within two weeks',
+        'tips': ['Start with stationary targets', 'Gradually increase speed']
+    },
+    'reaction_time': {
+        'practice_routine': 'Complete reaction time exercises',
+        'daily_duration': 15,
+        'goals': 'Reduce reaction time by 50ms',
+        'tips': ['Stay focused', 'Take regular breaks']
+    },
+    'decision_making': {
+        'practice_routine': 'Analyze gameplay recordings',
+        'daily_duration': 30,
+        'goals': 'Improve decision accuracy by 15%',
+        'tips': ['Study pro players', 'Practice with purpose']
+    },
+    'teamwork': {
+        'practice_routine': 'Participate in team practice sessions',
+        'daily_duration': 45,
+        'goals': 'Enhance team coordination score by 20%',
+        'tips': ['Communicate clearly', 'Learn from teammates']
+    }
+})
+
 class LLMSkillRecommender:
     """
     A class that uses LLM to generate personalized gaming skill recommendations.
     """
     
-    def __init__(self, llm_client):
+    def __init__(self,
+                 llm_client,
+                 cache: Optional[LLMCache] = None,
+                 requests_per_minute: Optional[float] = None,
+                 max_attempts: int = 5):
         """
         Initialize the LLM-based recommender.
         
         Args:
-            llm_client: An initialized LLM client (e.g., OpenAI, Anthropic)
+            llm_client: An initialized LLM client (e.g., OpenAI, Anthropic). Clients
+                exposing an async ``agenerate`` are awaited directly; otherwise the
+                blocking ``generate`` runs in the default executor.
+            cache (LLMCache, optional): Response cache, used only when the client
+                is configured with temperature 0; defaults to an in-memory cache
+            requests_per_minute (float, optional): Provider quota enforced with a
+                token bucket; None sends requests immediately
+            max_attempts (int): Attempts per request when the provider answers
+                with a rate limit or server error, backing off exponentially
         """
         self.llm = llm_client
+        self.cache = cache if cache is not None else LLMCache()
+        self.max_attempts = max_attempts
+        self._limiter = make_limiter(requests_per_minute)
         
     def generate_recommendations(self, analysis_results: Dict) -> List[Dict]:
         """
         Generate skill improvement recommendations using LLM.
         
+        Synchronous wrapper around agenerate_recommendations; use the async
+        method directly from within a running event loop.
+        
+        Args:
+            analysis_results (Dict): Performance analysis results
+            
+        Returns:
+            List[Dict]: Personalized recommendations
+        """
+        return asyncio.run(self.agenerate_recommendations(analysis_results))
+
+    async def agenerate_recommendations(self, analysis_results: Dict) -> List[Dict]:
+        """
+        Generate skill improvement recommendations using LLM without blocking
+        the event loop.
+        
         Args:
             analysis_results (Dict): Performance analysis results
             
@@ -36,18 +122,52 @@ class LLMSkillRecommender:
         
         try:
             # Get LLM response
-            response = self.llm.generate(prompt)
+            response = await self._agenerate(prompt)
             
             # Parse and validate recommendations
             recommendations = self._parse_recommendations(response)
             
-            logger.info(f"Generated {len(recommendations)} recommendations using LLM")
+            logger.info("Generated %d recommendations using LLM", len(recommendations))
             return recommendations
             
         except Exception as e:
-            logger.error(f"Error generating recommendations: {str(e)}")
+            logger.error("Error generating recommendations: %s", e)
             return self._get_fallback_recommendations(analysis_results)
 
+    async def _agenerate(self, prompt: str) -> str:
+        """
+        Get an LLM response, served from the cache for deterministic clients.
+        
+        Args:
+            prompt (str): Prompt to send to the LLM
+            
+        Returns:
+            str: Raw response from LLM
+        """
+        key = make_cache_key(prompt, self.llm) if is_cacheable(self.llm) else None
+        if key is not None:
+            response = self.cache.get(key)
+            if response is not None:
+                return response
+        
+        response = await call_with_retries(self._request, prompt, self.max_attempts)
+        
+        if key is not None:
+            self.cache.set(key, response)
+        return response
+
+    async def _request(self, prompt: str) -> str:
+        """
+        Send one request to the LLM once the rate limiter allows it.
+        
+        Args:
+            prompt (str): Prompt to send to the LLM
+            
+        Returns:
+            str: Raw response from LLM
+        """
+        return await send_request(self.llm, self._limiter, prompt)
+
     def _create_recommendation_prompt(self, analysis_results: Dict) -> str:
         """
         Create a prompt for the LLM to generate recommendations.
@@ -68,29 +188,12 @@ class LLMSkillRecommender:
                     'target_level': analysis['improvement_analysis']['suggested_target']
                 })
         
-        prompt = """As a professional gaming coach, provide specific practice recommendations for a player who needs to improve in the following areas:
-
-{metrics_details}
-
-For each metric that needs improvement, provide:
-1. A clear practice routine (what to practice and how long)
-2. Specific goals to aim for
-3. Tips for effective practice
-
-Format your response as a JSON object with the following structure for each metric:
-{
-    "metric": str,
-    "practice_routine": str,
-    "daily_duration": int (in minutes),
-    "goals": str,
-    "tips": list[str]
-}"""
-
-        metrics_details = ""
-        for metric in metrics_needing_improvement:
-            metrics_details += f"\n- {metric['metric'].title()}: Currently at {metric['current_level']:.1f}, aiming for {metric['target_level']:.1f}"
+        metrics_details = "".join(
+            f"\n- {metric['metric'].title()}: Currently at {metric['current_level']:.1f}, aiming for {metric['target_level']:.1f}"
+            for metric in metrics_needing_improvement
+        )
         
-        return prompt.format(metrics_details=metrics_details)
+        return _RECOMMENDATION_PROMPT_TEMPLATE.format_map({'metrics_details': metrics_details})
 
     def _parse_recommendations(self, llm_response: str) -> List[Dict]:
         """
@@ -104,19 +207,17 @@ Format your response as a JSON object with the following structure for each metr
         """
         try:
             # Extract JSON from response
-            recommendations = json.loads(llm_response)
+            recommendations = robust_json_parse(llm_response)
             
             # Validate required fields
-            required_fields = {'metric', 'practice_routine', 'daily_duration', 'goals', 'tips'}
-            
             validated_recommendations = []
             for rec in recommendations:
-                if all(field in rec for field in required_fields):
+                if _REQUIRED_RECOMMENDATION_FIELDS.issubset(rec):
                     validated_recommendations.append(rec)
             
             return validated_recommendations
             
-        except json.JSONDecodeError:
+        except ValueError:
             logger.error("Failed to parse LLM response as JSON")
             return []
 
@@ -130,39 +231,16 @@ Format your response as a JSON object with the following structure for each metr
         Returns:
             List[Dict]: Basic recommendations
         """
-        fallback_templates = {
-            'accuracy': {
-                'practice_routine': 'Practice aiming drills daily',
-                'daily_duration': 20,
-                'goals': 'Improve accuracy by 10% within two weeks',
-                'tips': ['Start with stationary targets', 'Gradually increase speed']
-            },
-            'reaction_time': {
-                'practice_routine': 'Complete reaction time exercises',
-                'daily_duration': 15,
-                'goals': 'Reduce reaction time by 50ms',
-                'tips': ['Stay focused', 'Take regular breaks']
-            },
-            'decision_making': {
-                'practice_routine': 'Analyze gameplay recordings',
-                'daily_duration': 30,
-                'goals': 'Improve decision accuracy by 15%',
-                'tips': ['Study pro players', 'Practice with purpose']
-            },
-            'teamwork': {
-                'practice_routine': 'Participate in team practice sessions',
-                'daily_duration': 45,
-                'goals': 'Enhance team coordination score by 20%',
-                'tips': ['Communicate clearly', 'Learn from teammates']
-            }
-        }
-        
         recommendations = []
         for metric, analysis in analysis_results.items():
             if analysis['improvement_analysis']['needs_improvement']:
-                if metric in fallback_templates:
-                    rec = fallback_templates[metric].copy()
-                    rec['metric'] = metric
-                    recommendations.append(rec)
+                template = _FALLBACK_RECOMMENDATIONS.get(metric)
+                if template is not None:
+                    # Templates are shared and read-only; hand out plain dicts
+                    recommendations.append({
+                        **template,
+                        'tips': list(template['tips']),
+                        'metric': metric
+                    })
         
         return recommendations
\ No newline at end of file
@@ -1,26 +1,119 @@
 # data_collector.py
 
+import asyncio
 import requests
 import pandas as pd
 import sqlite3
+import threading
 from bs4 import BeautifulSoup
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import logging
+import json
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is only needed for the async API fetches
+    aiohttp = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # selectolax is optional; fall back to BeautifulSoup
+    LexborHTMLParser = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # ijson is optional; fall back to buffering the whole body
+    ijson = None
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# CSS class of each scraped statistic's element -> statistic name
+_STAT_CLASSES = {
+    'accuracy-stat': 'accuracy',
+    'reaction-time-stat': 'reaction_time',
+    'decision-stat': 'decision_making',
+    'teamwork-stat': 'teamwork'
+}
+_STAT_SELECTOR = ', '.join(f'div.{stat_class}' for stat_class in _STAT_CLASSES)
+
+# Rows per chunk when reading player history from the database
+_DB_CHUNK_SIZE = 10_000
+
+# Reused verbatim on every call so sqlite3's statement cache keeps it prepared
+_PLAYER_STATS_QUERY = """
+    SELECT 
+        date,
+        accuracy,
+        reaction_time,
+        decision_making,
+        teamwork
+    FROM player_stats
+    WHERE player_id = ?
+    ORDER BY date DESC
+"""
+
+# Applied to new connections only when the collector is created with tune_db
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA mmap_size=268435456"
+)
+
 class DataCollector:
     """
     A class to collect gaming performance data from various sources including APIs,
     web scraping, and databases.
     """
     
-    def __init__(self):
-        """Initialize the DataCollector with a requests session."""
+    def __init__(self, tune_db: bool = False):
+        """
+        Initialize the DataCollector with a requests session for scraping.
+        
+        Args:
+            tune_db (bool): Switch opened databases to WAL mode and create the
+                (player_id, date) index used by the history query. Both
+                persistently change the database file, so they are opt-in.
+        """
         self.session = requests.Session()
+        self.tune_db = tune_db
+        self._aio_session: Optional['aiohttp.ClientSession'] = None
+        # sqlite3 connections must not be shared across threads, so each
+        # thread keeps its own cache; _connections tracks them for cleanup
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._conn_lock = threading.Lock()
         logger.info("DataCollector initialized")
     
+    async def _get_session(self) -> 'aiohttp.ClientSession':
+        """
+        Get the shared aiohttp session, creating it on first use.
+        
+        The session must be created inside a running event loop; reusing it
+        keeps connections alive across API requests.
+        
+        Returns:
+            aiohttp.ClientSession: Session for API requests
+            
+        Raises:
+            ImportError: If aiohttp is not installed
+        """
+        if aiohttp is None:
+            raise ImportError("aiohttp is required to fetch API data")
+        if self._aio_session is None or self._aio_session.closed:
+            self._aio_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self._aio_session
+    
     async def fetch_api_data(self, 
                            api_url: str, 
                            player_id: str, 
@@ -41,21 +134,68 @@ class DataCollector:
         """
         headers = {'Authorization': f'Bearer {api_key}'} if api_key else {}
         
+        session = await self._get_session()
+        
         try:
-            response = await self.session.get(
+            async with session.get(
                 f"{api_url}/players/{player_id}",
-                headers=headers,
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
-            logger.info(f"Successfully fetched API data for player {player_id}")
+                headers=headers
+            ) as response:
+                response.raise_for_status()
+                data = await self._read_json(response)
+            logger.info("Successfully fetched API data for player %s", player_id)
             return data
             
-        except requests.RequestException as e:
-            logger.error(f"API request failed: {str(e)}")
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.error("API request failed: %s", e)
             raise Exception(f"Failed to fetch API data: {str(e)}")
 
+    async def fetch_api_data_many(self,
+                                  player_requests: Iterable[Tuple[str, str]],
+                                  api_key: Optional[str] = None) -> List[Dict]:
+        """
+        Fetch statistics for several players concurrently.
+        
+        Args:
+            player_requests (Iterable[Tuple[str, str]]): (api_url, player_id) pairs
+            api_key (str, optional): API authentication key
+            
+        Returns:
+            List[Dict]: Player statistics, in request order
+            
+        Raises:
+            Exception: If any API request fails
+        """
+        return await asyncio.gather(*(
+            self.fetch_api_data(api_url, player_id, api_key)
+            for api_url, player_id in player_requests
+        ))
+
+    async def _read_json(self, response: 'aiohttp.ClientResponse'):
+        """
+        Decode a JSON response body, parsing it as it downloads when possible.
+        
+        Args:
+            response (aiohttp.ClientResponse): Response with an unread body
+            
+        Returns:
+            Decoded JSON value
+            
+        Raises:
+            ValueError: If the body is empty or not valid JSON
+        """
+        if ijson is None:
+            # Decode the raw body; response.json() returns None for an empty one
+            return _json_loads(await response.read())
+        
+        # Feed the byte stream straight into the incremental parser
+        try:
+            async for data in ijson.items(response.content, '', use_float=True):
+                return data
+        except ijson.JSONError as e:
+            raise ValueError(str(e)) from e
+        raise ValueError("Empty JSON response body")
+
     def scrape_web_data(self, url: str, player_username: str) -> Dict:
         """
         Scrape player statistics from gaming websites.
@@ -74,41 +214,68 @@ class DataCollector:
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            if LexborHTMLParser is not None:
+                nodes = LexborHTMLParser(response.content).css(_STAT_SELECTOR)
+                elements = (
+                    (node.attributes.get('class') or '', node.text(strip=True))
+                    for node in nodes
+                )
+            else:
+                soup = BeautifulSoup(response.content, 'html.parser')
+                elements = (
+                    (' '.join(tag.get('class', ())), tag.get_text(strip=True))
+                    for tag in soup.select(_STAT_SELECTOR)
+                )
             
             # Example scraping pattern - adjust selectors based on website structure
-            stats = {
-                'accuracy': self._parse_stat(soup, 'accuracy-stat'),
-                'reaction_time': self._parse_stat(soup, 'reaction-time-stat'),
-                'decision_making': self._parse_stat(soup, 'decision-stat'),
-                'teamwork': self._parse_stat(soup, 'teamwork-stat')
-            }
-            
-            logger.info(f"Successfully scraped web data for player {player_username}")
+            stats = self._parse_stats(elements)
+            
+            logger.info("Successfully scraped web data for player %s", player_username)
             return stats
             
         except Exception as e:
-            logger.error(f"Web scraping failed: {str(e)}")
+            logger.error("Web scraping failed: %s", e)
             raise Exception(f"Failed to scrape web data: {str(e)}")
 
-    def _parse_stat(self, soup: BeautifulSoup, stat_class: str) -> float:
+    def _parse_stats(self, elements: Iterable[Tuple[str, str]]) -> Dict[str, float]:
         """
-        Helper method to parse individual statistics from the webpage.
+        Parse all statistics from the webpage in a single selector pass.
         
         Args:
-            soup (BeautifulSoup): Parsed HTML content
+            elements (Iterable[Tuple[str, str]]): (class attribute, text) of
+                each element matching the statistic selector, in document order
+            
+        Returns:
+            Dict[str, float]: Statistic values, 0.0 for missing statistics
+        """
+        stats = dict.fromkeys(_STAT_CLASSES.values(), 0.0)
+        found = set()
+        
+        for classes, text in elements:
+            for css_class in classes.split():
+                stat = _STAT_CLASSES.get(css_class)
+                # Keep the first element per statistic, as a per-class lookup would
+                if stat is not None and stat not in found:
+                    found.add(stat)
+                    stats[stat] = self._parse_stat(text, css_class)
+        
+        return stats
+
+    def _parse_stat(self, text: str, stat_class: str) -> float:
+        """
+        Helper method to parse an individual statistic from its element text.
+        
+        Args:
+            text (str): Stripped text of the element holding the statistic
             stat_class (str): CSS class for the statistic
             
         Returns:
             float: Parsed statistic value
         """
         try:
-            stat_element = soup.find('div', class_=stat_class)
-            if stat_element:
-                return float(stat_element.text.strip())
-            return 0.0
-        except (ValueError, AttributeError):
-            logger.warning(f"Failed to parse stat with class {stat_class}")
+            return float(text)
+        except ValueError:
+            logger.warning("Failed to parse stat with class %s", stat_class)
             return 0.0
 
     def fetch_db_data(self, db_path: str, player_id: str) -> pd.DataFrame:
@@ -126,30 +293,82 @@ class DataCollector:
             Exception: If database query fails
         """
         try:
-            conn = sqlite3.connect(db_path)
-            query = """
-                SELECT 
-                    date,
-                    accuracy,
-                    reaction_time,
-                    decision_making,
-                    teamwork
-                FROM player_stats
-                WHERE player_id = ?
-                ORDER BY date DESC
-            """
-            
-            df = pd.read_sql_query(query, conn, params=(player_id,))
-            conn.close()
+            conn = self._get_connection(db_path)
             
-            logger.info(f"Successfully fetched database data for player {player_id}")
+            # Read in chunks to cap peak memory on long histories
+            chunks = pd.read_sql_query(
+                _PLAYER_STATS_QUERY, conn, params=(player_id,), chunksize=_DB_CHUNK_SIZE
+            )
+            df = pd.concat(chunks, ignore_index=True)
+            
+            logger.info("Successfully fetched database data for player %s", player_id)
             return df
             
         except Exception as e:
-            logger.error(f"Database query failed: {str(e)}")
+            logger.error("Database query failed: %s", e)
             raise Exception(f"Failed to fetch database data: {str(e)}")
 
+    def _get_connection(self, db_path: str) -> sqlite3.Connection:
+        """
+        Get this thread's cached connection for a database, opening it on first use.
+        
+        With tune_db set, new connections are switched to WAL mode and the
+        (player_id, date) index used by the history query is created if it
+        is missing.
+        
+        Args:
+            db_path (str): Path to the SQLite database
+            
+        Returns:
+            sqlite3.Connection: Open connection to the database
+        """
+        conn_cache = getattr(self._local, 'conn_cache', None)
+        if conn_cache is None:
+            conn_cache = self._local.conn_cache = {}
+        conn = conn_cache.get(db_path)
+        if conn is not None:
+            return conn
+        
+        # check_same_thread is off only so cleanup() may close it from any thread
+        conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        if self.tune_db:
+            for pragma in _CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            
+            try:
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_player_stats_player_date "
+                    "ON player_stats (player_id, date)"
+                )
+            except sqlite3.Error as e:
+                logger.warning("Could not ensure player_stats index in %s: %s", db_path, e)
+        
+        conn_cache[db_path] = conn
+        with self._conn_lock:
+            self._connections.append(conn)
+        return conn
+
     def cleanup(self):
-        """Clean up resources used by the DataCollector."""
+        """
+        Clean up resources used by the DataCollector.
+        
+        The aiohttp session can only be closed from a running event loop;
+        use aclose() when API fetches were made.
+        """
         self.session.close()
-        logger.info("DataCollector resources cleaned up")
\ No newline at end of file
+        with self._conn_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        # Caches in other threads are dropped along with the thread-local
+        self._local = threading.local()
+        if self._aio_session is not None and not self._aio_session.closed:
+            logger.warning("aiohttp session left open; call aclose() to close it")
+        logger.info("DataCollector resources cleaned up")
+
+    async def aclose(self):
+        """Close the aiohttp session, then clean up the remaining resources."""
+        if self._aio_session is not None:
+            await self._aio_session.close()
+            self._aio_session = None
+        self.cleanup()
\ No newline at end of file
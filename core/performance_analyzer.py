@@ -4,11 +4,168 @@ import pandas as pd
 import numpy as np
 from scipy import stats
 from typing import Dict, Tuple, List
+from functools import lru_cache
+from operator import itemgetter
+from types import MappingProxyType
 import logging
 
-logging.basicConfig(level=logging.INFO)
+from shared_utils import njit, prange
+
 logger = logging.getLogger(__name__)
 
+# Metrics analyzed, in output order
+_METRIC_COLUMNS = ('accuracy', 'reaction_time', 'decision_making', 'teamwork')
+
+# Two-sided significance level for trend slopes
+_TREND_ALPHA = 0.05
+
+@lru_cache(maxsize=64)
+def _centered_index(n: int) -> Tuple[np.ndarray, float]:
+    """Return the centered time index 0..n-1 and its sum of squares for series of length n."""
+    dx = np.arange(n, dtype=np.float64)
+    dx -= dx.mean()
+    dx.flags.writeable = False
+    return dx, float(dx @ dx)
+
+@lru_cache(maxsize=64)
+def _t_critical(df: int) -> float:
+    """Return the |t| above which a slope is significant at _TREND_ALPHA."""
+    return float(stats.t.ppf(1 - _TREND_ALPHA / 2, df)) if df > 0 else np.inf
+
+# Metric-specific z-score thresholds and ideal directions
+_METRIC_CONFIG = MappingProxyType({
+    'accuracy': MappingProxyType({'threshold': -1.0, 'higher_better': True}),
+    'reaction_time': MappingProxyType({'threshold': 1.0, 'higher_better': False}),
+    'decision_making': MappingProxyType({'threshold': -1.0, 'higher_better': True}),
+    'teamwork': MappingProxyType({'threshold': -1.0, 'higher_better': True})
+})
+_DEFAULT_METRIC_CONFIG = MappingProxyType({'threshold': -1.0, 'higher_better': True})
+
+def _partition_quartiles(values: np.ndarray) -> Tuple[float, float]:
+    """
+    Linearly interpolated first and third quartiles via a single O(n) partition.
+    
+    Missing values are dropped first, as pandas' quantile does, so the quartile
+    positions are sized from the values actually present.
+    """
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return np.nan, np.nan
+    
+    last = len(values) - 1
+    positions = (0.25 * last, 0.75 * last)
+    indices = [int(position) for position in positions]
+    kth = sorted({index + offset for index in indices for offset in (0, 1) if index + offset <= last})
+    partitioned = np.partition(values, kth)
+    
+    quartiles = []
+    for position, index in zip(positions, indices):
+        lower_value = partitioned[index]
+        upper_value = partitioned[min(index + 1, last)]
+        quartiles.append(lower_value + (upper_value - lower_value) * (position - index))
+    return quartiles[0], quartiles[1]
+
+# Number of most recent observations compared against history
+_RECENT_WINDOW = 5
+
+# Columns of the per-metric statistics produced by _analyze_kernel
+(_LOWER_BOUND, _UPPER_BOUND, _OUTLIER_COUNT, _MEAN, _MEDIAN, _STD,
+ _CLEAN_MEAN, _CLEAN_MEDIAN, _CLEAN_STD, _RECENT_MEAN, _SLOPE, _R_VALUE) = range(12)
+_STAT_COUNT = 12
+
+@njit(cache=True)
+def _sorted_quantile(sorted_values, q):
+    """Linearly interpolated quantile of an ascending array, as pandas computes it."""
+    position = q * (len(sorted_values) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    lower_value = float(sorted_values[lower])
+    return lower_value + (float(sorted_values[upper]) - lower_value) * fraction
+
+@njit(parallel=True, cache=True, error_model='numpy')
+def _analyze_kernel(data, dx, sxx, threshold_multiplier, out):
+    """
+    Fill out[i] with the outlier bounds, raw/clean statistics and trend of metric row data[i].
+
+    Missing (NaN) values are dropped per row before any statistic is taken, as
+    pandas' skipna reductions do; they are never counted as outliers, and a
+    row with gaps gets a NaN trend, as stats.linregress gives for it. Each
+    row's valid values are read twice: once to sort a float64 copy
+    (quantiles, bounds and the sum) and once to form deviations from the mean
+    (variance and the regression against the centered index dx). Clean
+    statistics are corrected from the outliers alone, which sit at the two
+    ends of the sorted copy.
+    """
+    for i in prange(data.shape[0]):
+        row = data[i]
+        values = row[~np.isnan(row)]
+        n = len(values)
+        
+        # Mean of the most recent observations that are present
+        recent = row[-_RECENT_WINDOW:]
+        recent = recent[~np.isnan(recent)]
+        out[i, _RECENT_MEAN] = recent.astype(np.float64).mean() if len(recent) else np.nan
+        
+        if n == 0:
+            out[i, :_RECENT_MEAN] = np.nan
+            out[i, _OUTLIER_COUNT] = 0
+            out[i, _SLOPE] = np.nan
+            out[i, _R_VALUE] = np.nan
+            continue
+        
+        sorted_values = values.astype(np.float64)
+        sorted_values.sort()
+        
+        q1 = _sorted_quantile(sorted_values, 0.25)
+        q3 = _sorted_quantile(sorted_values, 0.75)
+        iqr = q3 - q1
+        lower_bound = q1 - (threshold_multiplier * iqr)
+        upper_bound = q3 + (threshold_multiplier * iqr)
+        
+        # Values inside the bounds form a contiguous run of the sorted array
+        start = np.searchsorted(sorted_values, lower_bound, side='left')
+        stop = np.searchsorted(sorted_values, upper_bound, side='right')
+        clean_count = stop - start
+        
+        mean = sorted_values.sum() / n
+        deviations = values - mean
+        syy = np.dot(deviations, deviations)
+        
+        # Remove the outliers' share of the deviation sums to get the clean moments
+        low_outliers = sorted_values[:start] - mean
+        high_outliers = sorted_values[stop:] - mean
+        clean_offset = -(low_outliers.sum() + high_outliers.sum()) / clean_count
+        clean_syy = (syy - np.dot(low_outliers, low_outliers) - np.dot(high_outliers, high_outliers)
+                     - clean_count * clean_offset * clean_offset)
+        
+        slope = np.nan
+        r_value = np.nan
+        if n == len(row):
+            sxy = np.dot(deviations, dx)
+            slope = sxy / sxx
+            # Constant rows have an undefined correlation unless the slope is nonzero,
+            # matching scipy's linregress
+            if syy > 0:
+                r_value = min(max(sxy / np.sqrt(sxx * syy), -1.0), 1.0)
+            elif sxy != 0:
+                r_value = 0.0
+        
+        out[i, _LOWER_BOUND] = lower_bound
+        out[i, _UPPER_BOUND] = upper_bound
+        out[i, _OUTLIER_COUNT] = n - clean_count
+        out[i, _MEAN] = mean
+        out[i, _MEDIAN] = _sorted_quantile(sorted_values, 0.5)
+        out[i, _STD] = np.sqrt(syy / (n - 1))
+        out[i, _CLEAN_MEAN] = mean + clean_offset
+        out[i, _CLEAN_MEDIAN] = _sorted_quantile(sorted_values[start:stop], 0.5)
+        out[i, _CLEAN_STD] = np.sqrt(max(clean_syy, 0.0) / (clean_count - 1))
+        out[i, _SLOPE] = slope
+        out[i, _R_VALUE] = r_value
+
+# Compile (or load from the on-disk cache) at import rather than on first analysis
+_analyze_kernel(np.zeros((4, 16), dtype=np.float32), *_centered_index(16), 1.5, np.empty((4, _STAT_COUNT)))
+
 class PerformanceAnalyzer:
     """
     A class to analyze gaming performance metrics and detect areas for improvement.
@@ -22,7 +179,7 @@ class PerformanceAnalyzer:
             threshold_multiplier (float): Multiplier for IQR in outlier detection
         """
         self.threshold_multiplier = threshold_multiplier
-        logger.info(f"PerformanceAnalyzer initialized with threshold multiplier {threshold_multiplier}")
+        logger.info("PerformanceAnalyzer initialized with threshold multiplier %s", threshold_multiplier)
 
     def detect_outliers(self, data: pd.Series) -> Tuple[pd.Series, Dict]:
         """
@@ -34,29 +191,35 @@ class PerformanceAnalyzer:
         Returns:
             Tuple[pd.Series, Dict]: Boolean mask of outliers and outlier statistics
         """
-        Q1 = data.quantile(0.25)
-        Q3 = data.quantile(0.75)
+        values = np.asarray(data, dtype=np.float64)
+        Q1, Q3 = _partition_quartiles(values)
         IQR = Q3 - Q1
         
         lower_bound = Q1 - (self.threshold_multiplier * IQR)
         upper_bound = Q3 + (self.threshold_multiplier * IQR)
         
-        outliers = (data < lower_bound) | (data > upper_bound)
+        mask = (values < lower_bound) | (values > upper_bound)
+        outliers = pd.Series(mask, index=data.index, name=data.name)
+        total_outliers = np.count_nonzero(mask)
         
         stats = {
-            'total_outliers': outliers.sum(),
-            'outlier_percentage': (outliers.sum() / len(data)) * 100,
+            'total_outliers': total_outliers,
+            'outlier_percentage': (total_outliers / len(values)) * 100,
             'lower_bound': lower_bound,
             'upper_bound': upper_bound
         }
         
-        logger.info(f"Detected {stats['total_outliers']} outliers ({stats['outlier_percentage']:.2f}%)")
+        logger.info("Detected %d outliers (%.2f%%)", stats['total_outliers'], stats['outlier_percentage'])
         return outliers, stats
 
     def analyze_performance(self, historical_data: pd.DataFrame) -> Dict:
         """
         Analyze player performance metrics comprehensively.
         
+        All metrics are analyzed together as rows of a single float32 array
+        by a compiled kernel that handles each metric in parallel, reading
+        each row twice.
+        
         Args:
             historical_data (pd.DataFrame): Historical performance data
             
@@ -64,95 +227,111 @@ class PerformanceAnalyzer:
             Dict: Comprehensive analysis results for each metric
         """
         metrics = {}
+        columns = [column for column in _METRIC_COLUMNS if column in historical_data.columns]
+        if not columns:
+            logger.info("Completed performance analysis for all metrics")
+            return metrics
         
-        for column in ['accuracy', 'reaction_time', 'decision_making', 'teamwork']:
-            if column in historical_data.columns:
-                data = historical_data[column]
-                
-                # Detect outliers
-                outliers, outlier_stats = self.detect_outliers(data)
-                clean_data = data[~outliers]
-                
-                # Calculate basic statistics
-                metrics[column] = {
-                    'current_stats': {
-                        'mean': data.mean(),
-                        'median': data.median(),
-                        'std': data.std(),
-                        'trend': self._calculate_trend(data)
-                    },
-                    'outlier_stats': outlier_stats,
-                    'clean_stats': {
-                        'mean': clean_data.mean(),
-                        'median': clean_data.median(),
-                        'std': clean_data.std()
-                    }
+        # One contiguous float32 row per metric (structure of arrays); reductions
+        # accumulate in float64 so only the stored values are rounded
+        data = np.ascontiguousarray(historical_data[columns].to_numpy(dtype=np.float32).T)
+        
+        # Outlier bounds, raw/clean statistics and trends for every metric in one kernel
+        n = data.shape[1]
+        results = np.empty((len(columns), _STAT_COUNT))
+        _analyze_kernel(data, *_centered_index(n), float(self.threshold_multiplier), results)
+        trends = self._calculate_trends(results[:, _SLOPE], results[:, _R_VALUE], data)
+        
+        for i, column in enumerate(columns):
+            stats_row = results[i]
+            outlier_stats = {
+                'total_outliers': int(stats_row[_OUTLIER_COUNT]),
+                'outlier_percentage': (stats_row[_OUTLIER_COUNT] / data.shape[1]) * 100,
+                'lower_bound': stats_row[_LOWER_BOUND],
+                'upper_bound': stats_row[_UPPER_BOUND]
+            }
+            logger.info("Detected %d outliers (%.2f%%)", outlier_stats['total_outliers'], outlier_stats['outlier_percentage'])
+            
+            metrics[column] = {
+                'current_stats': {
+                    'mean': stats_row[_MEAN],
+                    'median': stats_row[_MEDIAN],
+                    'std': stats_row[_STD],
+                    'trend': trends[i]
+                },
+                'outlier_stats': outlier_stats,
+                'clean_stats': {
+                    'mean': stats_row[_CLEAN_MEAN],
+                    'median': stats_row[_CLEAN_MEDIAN],
+                    'std': stats_row[_CLEAN_STD]
                 }
-                
-                # Add improvement analysis
-                metrics[column].update(
-                    self._analyze_improvement_needs(data, clean_data, column)
+            }
+            
+            # Add improvement analysis
+            metrics[column].update(
+                self._analyze_improvement_needs(
+                    stats_row[_RECENT_MEAN], stats_row[_CLEAN_MEAN], stats_row[_CLEAN_STD], column
                 )
+            )
                 
         logger.info("Completed performance analysis for all metrics")
         return metrics
 
-    def _calculate_trend(self, data: pd.Series) -> Dict:
+    def _calculate_trends(self, slopes: np.ndarray, r_values: np.ndarray, data: np.ndarray) -> List[Dict]:
         """
-        Calculate performance trend using linear regression.
+        Describe performance trends from least-squares regression results.
         
         Args:
-            data (pd.Series): Time series of performance metric
+            slopes (np.ndarray): Regression slope for each metric
+            r_values (np.ndarray): Correlation coefficient for each metric
+            data (np.ndarray): (metric, observation) values the trends were fitted on
             
         Returns:
-            Dict: Trend analysis results
+            List[Dict]: Trend analysis results for each metric
         """
-        x = np.arange(len(data))
-        slope, intercept, r_value, p_value, std_err = stats.linregress(x, data)
-        
-        trend_strength = abs(r_value)
-        trend_direction = 'improving' if slope > 0 else 'declining'
-        
-        trend_info = {
-            'direction': trend_direction,
-            'slope': slope,
-            'r_squared': r_value ** 2,
-            'significance': p_value < 0.05,
-            'strength': 'strong' if trend_strength > 0.7 else 'moderate' if trend_strength > 0.3 else 'weak'
-        }
+        n = data.shape[1]
+        if n == 2:
+            # Two points always fit exactly; linregress reports p = 1 for equal
+            # values and p = nan when either is missing
+            significant = (data[:, 0] != data[:, 1]) & ~np.isnan(data).any(axis=1)
+        else:
+            # Compare |t| with the critical value instead of evaluating p-values
+            df = n - 2
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t_values = r_values * np.sqrt(df / ((1.0 - r_values) * (1.0 + r_values)))
+            significant = np.abs(t_values) > _t_critical(df)
+        
+        trends = []
+        for slope, r_value, is_significant in zip(slopes, r_values, significant):
+            trend_strength = abs(r_value)
+            trends.append({
+                'direction': 'improving' if slope > 0 else 'declining',
+                'slope': slope,
+                'r_squared': r_value ** 2,
+                'significance': is_significant,
+                'strength': 'strong' if trend_strength > 0.7 else 'moderate' if trend_strength > 0.3 else 'weak'
+            })
         
-        return trend_info
+        return trends
 
     def _analyze_improvement_needs(self, 
-                                raw_data: pd.Series, 
-                                clean_data: pd.Series, 
+                                recent_mean: float, 
+                                historical_mean: float, 
+                                historical_std: float, 
                                 metric: str) -> Dict:
         """
         Determine if and how much improvement is needed for a metric.
         
         Args:
-            raw_data (pd.Series): Original performance data
-            clean_data (pd.Series): Performance data with outliers removed
+            recent_mean (float): Mean of the most recent observations
+            historical_mean (float): Mean of the data with outliers removed
+            historical_std (float): Standard deviation of the data with outliers removed
             metric (str): Name of the metric being analyzed
             
         Returns:
             Dict: Improvement analysis results
         """
-        recent_window = 5  # Consider last 5 observations
-        
-        recent_mean = raw_data.tail(recent_window).mean()
-        historical_mean = clean_data.mean()
-        historical_std = clean_data.std()
-        
-        # Define metric-specific thresholds and ideal directions
-        metric_configs = {
-            'accuracy': {'threshold': -1.0, 'higher_better': True},
-            'reaction_time': {'threshold': 1.0, 'higher_better': False},
-            'decision_making': {'threshold': -1.0, 'higher_better': True},
-            'teamwork': {'threshold': -1.0, 'higher_better': True}
-        }
-        
-        config = metric_configs.get(metric, {'threshold': -1.0, 'higher_better': True})
+        config = _METRIC_CONFIG.get(metric, _DEFAULT_METRIC_CONFIG)
         z_score = (recent_mean - historical_mean) / historical_std
         
         # Determine improvement needs
@@ -183,25 +362,28 @@ class PerformanceAnalyzer:
         Returns:
             List[Dict]: List of specific recommendations for improvement
         """
-        recommendations = []
+        ranked = []
         
         for metric, analysis in analysis_results.items():
             if analysis['improvement_analysis']['needs_improvement']:
                 current = analysis['current_stats']['mean']
                 target = analysis['improvement_analysis']['suggested_target']
                 trend = analysis['current_stats']['trend']
+                is_high = analysis['improvement_analysis']['z_score'] < -2
                 
-                recommendations.append({
+                # Rank 0 sorts high priority first; computed once per recommendation
+                ranked.append((0 if is_high else 1, {
                     'metric': metric,
                     'current_level': current,
                     'target_level': target,
                     'improvement_needed': abs(target - current),
                     'trend_info': trend,
-                    'priority': 'high' if analysis['improvement_analysis']['z_score'] < -2 else 'medium'
-                })
+                    'priority': 'high' if is_high else 'medium'
+                }))
         
-        # Sort recommendations by priority
-        recommendations.sort(key=lambda x: x['priority'] == 'high', reverse=True)
+        # Sort recommendations by priority (stable, so input order is kept within a rank)
+        ranked.sort(key=itemgetter(0))
+        recommendations = [recommendation for _, recommendation in ranked]
         
-        logger.info(f"Generated {len(recommendations)} improvement recommendations")
+        logger.info("Generated %d improvement recommendations", len(recommendations))
         return recommendations
\ No newline at end of file
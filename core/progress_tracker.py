@@ -5,18 +5,111 @@ import numpy as np
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
-from scipy import stats
+from operator import itemgetter
+from scipy import special
+
+from shared_utils import njit, prange
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Guards r = +/-1 in the t statistic, as stats.linregress does
+_TINY = 1.0e-20
+
+# Slopes this close to zero are rounding error from the one-pass moments
+# (e.g. ~1e-15 on flat integer histories) and count as no improvement
+_SLOPE_TOLERANCE = 1.0e-9
+
+# Columns of the per-period statistics produced by _period_stats
+_MEAN, _STD, _PERCENTILE, _SLOPE, _R_VALUE, _COUNT, _FIRST = range(7)
+_STAT_COUNT = 7
+
+@njit(parallel=True, cache=True, error_model='numpy')
+def _period_stats(windows, current_values, out):
+    """
+    Fill out[i] with the count, first value, mean, sample std, percentile rank of
+    current_values[i], and least-squares trend against the observation index of
+    the values in row windows[i].
+
+    Missing (NaN) values are skipped, so each row gives the same result as if it
+    had been dropna'd first. Moments, the co-moment with the index and the rank
+    counts of the current value are all accumulated in a single Welford pass;
+    the percentile matches stats.percentileofscore(kind='rank') and the trend
+    matches stats.linregress.
+    """
+    for i in prange(windows.shape[0]):
+        current = current_values[i]
+        count = 0
+        first = np.nan
+        mean = 0.0
+        index_mean = 0.0
+        m2 = 0.0
+        co_moment = 0.0
+        below = 0
+        at_or_below = 0
+        for value in windows[i]:
+            if np.isnan(value):
+                continue
+            if count == 0:
+                first = value
+            dx = count - index_mean
+            count += 1
+            dy = value - mean
+            mean += dy / count
+            index_mean += dx / count
+            m2 += dy * (value - mean)
+            co_moment += dx * (value - mean)
+            if value < current:
+                below += 1
+            if value <= current:
+                at_or_below += 1
+        ties = 1 if at_or_below > below else 0
+        sxx = count * (count * count - 1) / 12.0
+        
+        # Constant rows have an undefined correlation unless the slope is nonzero
+        r_value = np.nan
+        if m2 > 0:
+            r_value = min(max(co_moment / np.sqrt(sxx * m2), -1.0), 1.0)
+        elif co_moment != 0:
+            r_value = 0.0
+        
+        out[i, _COUNT] = count
+        out[i, _FIRST] = first
+        out[i, _MEAN] = mean if count else np.nan
+        out[i, _STD] = np.sqrt(m2 / (count - 1)) if count > 1 else np.nan
+        out[i, _PERCENTILE] = (below + at_or_below + ties) * 50.0 / count if count else np.nan
+        out[i, _SLOPE] = co_moment / sxx if count > 1 else np.nan
+        out[i, _R_VALUE] = r_value
+
+# Compile (or load from the on-disk cache) at import rather than on first tracking call;
+# period windows are column slices of the history, hence the strided warm-up input
+_period_stats(np.zeros((4, 16))[:, 1:], np.zeros(4), np.empty((4, _STAT_COUNT)))
+
+def _trend_p_values(r_values: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Compute two-sided p-values for trend correlations, as stats.linregress does.
+    
+    Args:
+        r_values (np.ndarray): Correlations with the observation index
+        counts (np.ndarray): Number of values each correlation was fitted on
+        
+    Returns:
+        np.ndarray: p-values; NaN where fewer than two values were fitted
+    """
+    df = counts - 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_values = r_values * np.sqrt(df / ((1.0 - r_values + _TINY) * (1.0 + r_values + _TINY)))
+        p_values = 2 * special.stdtr(df, -np.abs(t_values))
+    
+    # Two points always fit exactly: p is 1 for equal values (undefined r), else 0
+    return np.where(counts == 2, np.where(np.isnan(r_values), 1.0, 0.0), p_values)
+
 class ProgressTracker:
     """
     A class to track and analyze player progress over time by comparing
     current performance with historical data.
     """
     
-    def __init__(self, lookback_periods: Dict[str, int] = None):
+    def __init__(self, lookback_periods: Optional[Dict[str, int]] = None):
         """
         Initialize the progress tracker with customizable lookback periods.
         
@@ -34,7 +127,8 @@ class ProgressTracker:
     def track_progress(self, 
                       current_stats: Dict,
                       historical_data: pd.DataFrame,
-                      target_metrics: Dict) -> Dict:
+                      target_metrics: Dict,
+                      now: Optional[datetime] = None) -> Dict:
         """
         Track progress by comparing current stats with historical data.
         
@@ -42,160 +136,198 @@ class ProgressTracker:
             current_stats (Dict): Current performance metrics
             historical_data (pd.DataFrame): Historical performance data
             target_metrics (Dict): Target values for each metric
+            now (datetime, optional): Time the lookback periods end at; read once
+                from the clock if not given, so repeated runs can share a fixed time
             
         Returns:
             Dict: Comprehensive progress analysis
         """
         progress_report = {}
         
-        for metric, current_value in current_stats.items():
-            if metric in historical_data.columns:
-                # Get historical values for the metric
-                metric_history = historical_data[metric].dropna()
+        # Convert once to shared timestamps plus one float array per metric
+        timestamps, columns = self._to_soa(historical_data, current_stats)
+        
+        # Resolve each period once as (name, days, first row), located by binary search
+        # and shared by all metrics
+        now = now or datetime.now()
+        cutoffs = np.array(
+            [now - timedelta(days=days) for days in self.lookback_periods.values()],
+            dtype='datetime64[ns]'
+        )
+        periods = list(zip(
+            self.lookback_periods.keys(),
+            self.lookback_periods.values(),
+            np.searchsorted(timestamps, cutoffs).tolist()
+        ))
+        
+        # Missing values are skipped inside the kernel, so every metric shares the
+        # periods and all metrics are analyzed as one batch without copies per metric
+        names = list(columns)
+        histories = np.stack(list(columns.values())) if names else np.empty((0, timestamps.size))
+        period_stats, p_values = self._period_statistics(
+            histories,
+            np.array([current_stats[metric] for metric in names], dtype=np.float64),
+            periods
+        )
+        has_history = ~np.isnan(histories).all(axis=1)
+        
+        for row, metric in enumerate(names):
+            if has_history[row]:
+                current_value = current_stats[metric]
                 
-                if not metric_history.empty:
-                    # Calculate progress metrics
-                    progress_report[metric] = {
-                        'current_value': current_value,
-                        'target_value': target_metrics.get(metric),
-                        'historical_comparison': self._compare_with_history(
-                            current_value,
-                            metric_history
-                        ),
-                        'trend_analysis': self._analyze_trend(metric_history),
-                        'improvement_rate': self._calculate_improvement_rate(
-                            current_value,
-                            metric_history
-                        ),
-                        'milestone_progress': self._track_milestones(
-                            current_value,
-                            target_metrics.get(metric, current_value * 1.2)
-                        )
-                    }
-        
-        logger.info(f"Completed progress tracking for {len(progress_report)} metrics")
+                # Calculate progress metrics
+                progress_report[metric] = {
+                    'current_value': current_value,
+                    'target_value': target_metrics.get(metric),
+                    **self._analyze_all_periods(
+                        current_value,
+                        periods,
+                        period_stats[:, row],
+                        p_values[:, row]
+                    ),
+                    'milestone_progress': self._track_milestones(
+                        current_value,
+                        target_metrics.get(metric, current_value * 1.2)
+                    )
+                }
+        
+        logger.info("Completed progress tracking for %d metrics", len(progress_report))
         return progress_report
 
-    def _compare_with_history(self, 
-                            current_value: float,
-                            history: pd.Series) -> Dict:
+    def _to_soa(self,
+                historical_data: pd.DataFrame,
+                metrics: Dict) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
         """
-        Compare current value with historical data across different time periods.
+        Convert historical data to sorted timestamps and one contiguous array per metric.
         
         Args:
-            current_value (float): Current metric value
-            history (pd.Series): Historical values with timestamps
+            historical_data (pd.DataFrame): Historical performance data
+            metrics (Dict): Metrics to extract; names missing from the data are skipped
             
         Returns:
-            Dict: Comparison results for different time periods
+            Tuple[np.ndarray, Dict[str, np.ndarray]]: datetime64[ns] timestamps in
+                ascending order and each metric's values in the same order
         """
-        comparisons = {}
+        # Histories normally arrive in time order; only copy and sort when they do not
+        if not historical_data.index.is_monotonic_increasing:
+            historical_data = historical_data.sort_index()
+        timestamps = historical_data.index.values.astype('datetime64[ns]')
         
-        for period_name, days in self.lookback_periods.items():
-            cutoff_date = datetime.now() - timedelta(days=days)
-            period_data = history[history.index >= cutoff_date]
-            
-            if not period_data.empty:
-                period_avg = period_data.mean()
-                period_std = period_data.std()
-                
-                comparisons[period_name] = {
-                    'average': period_avg,
-                    'change': ((current_value - period_avg) / period_avg) * 100,
-                    'z_score': (current_value - period_avg) / period_std if period_std > 0 else 0,
-                    'percentile': stats.percentileofscore(period_data, current_value)
-                }
+        # One (metric, time) block, so each metric's row is contiguous
+        names = [metric for metric in metrics if metric in historical_data.columns]
+        values = np.ascontiguousarray(historical_data[names].to_numpy(dtype=np.float64).T)
         
-        return comparisons
+        return timestamps, dict(zip(names, values))
 
-    def _analyze_trend(self, history: pd.Series) -> Dict:
+    def _period_statistics(self,
+                           histories: np.ndarray,
+                           current_values: np.ndarray,
+                           periods: List[Tuple[str, int, int]]) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Analyze performance trends over different time periods.
+        Compute per-period statistics and trend p-values for a batch of metrics.
         
         Args:
-            history (pd.Series): Historical performance data
+            histories (np.ndarray): (M, N) values of M metrics in time order, NaN where missing
+            current_values (np.ndarray): Current value of each metric
+            periods (List[Tuple[str, int, int]]): Name, days and first row of each lookback period
             
         Returns:
-            Dict: Trend analysis results
+            Tuple[np.ndarray, np.ndarray]: (P, M, _STAT_COUNT) statistics and (P, M)
+                trend p-values
         """
-        trend_analysis = {}
+        period_stats = np.empty((len(periods), len(histories), _STAT_COUNT))
         
-        for period_name, days in self.lookback_periods.items():
-            cutoff_date = datetime.now() - timedelta(days=days)
-            period_data = history[history.index >= cutoff_date]
-            
-            if len(period_data) >= 2:
-                # Calculate linear regression
-                x = np.arange(len(period_data))
-                slope, intercept, r_value, p_value, std_err = stats.linregress(
-                    x,
-                    period_data.values
-                )
-                
-                trend_analysis[period_name] = {
-                    'slope': slope,
-                    'direction': 'improving' if slope > 0 else 'declining',
-                    'strength': abs(r_value),
-                    'significance': p_value < 0.05,
-                    'volatility': period_data.std() / period_data.mean()
-                }
+        for position, (_, _, start) in enumerate(periods):
+            _period_stats(histories[:, start:], current_values, period_stats[position])
         
-        return trend_analysis
+        p_values = _trend_p_values(period_stats[..., _R_VALUE], period_stats[..., _COUNT])
+        return period_stats, p_values
 
-    def _calculate_improvement_rate(self,
-                                 current_value: float,
-                                 history: pd.Series) -> Dict:
+    def _analyze_all_periods(self,
+                             current_value: float,
+                             periods: List[Tuple[str, int, int]],
+                             period_stats: np.ndarray,
+                             p_values: np.ndarray) -> Dict[str, Dict]:
         """
-        Calculate rate of improvement over different time periods.
+        Compare, trend and rate a metric's history across all lookback periods.
+        
+        Each period's mean and standard deviation are shared by the comparison,
+        trend and improvement rate results.
         
         Args:
             current_value (float): Current metric value
-            history (pd.Series): Historical values
+            periods (List[Tuple[str, int, int]]): Name, days and first row of each lookback period
+            period_stats (np.ndarray): (P, _STAT_COUNT) statistics from _period_statistics
+            p_values (np.ndarray): Trend p-value of each period
             
         Returns:
-            Dict: Improvement rates and projections
+            Dict[str, Dict]: 'historical_comparison', 'trend_analysis' and
+                'improvement_rate' results keyed by period name
         """
+        comparisons = {}
+        trend_analysis = {}
         improvement_analysis = {}
         
-        for period_name, days in self.lookback_periods.items():
-            cutoff_date = datetime.now() - timedelta(days=days)
-            period_data = history[history.index >= cutoff_date]
+        for (period_name, days, _), stats_row, p_value in zip(periods, period_stats, p_values):
+            (period_avg, period_std, percentile, slope, r_value,
+             count, start_value) = stats_row
             
-            if not period_data.empty:
-                start_value = period_data.iloc[0]
-                
-                # Calculate improvement rate
-                total_change = current_value - start_value
-                daily_rate = total_change / days
-                
-                improvement_analysis[period_name] = {
-                    'total_change_percent': (total_change / start_value) * 100,
-                    'daily_rate': daily_rate,
-                    'weekly_rate': daily_rate * 7,
-                    'projected_30d': current_value + (daily_rate * 30),
-                    'consistency': self._calculate_consistency(period_data)
+            if not count:
+                continue
+            
+            # Coefficient of variation, shared by volatility and consistency
+            variation = period_std / period_avg
+            
+            comparisons[period_name] = {
+                'average': period_avg,
+                'change': ((current_value - period_avg) / period_avg) * 100,
+                'z_score': (current_value - period_avg) / period_std if period_std > 0 else 0,
+                'percentile': percentile
+            }
+            
+            if count >= 2:
+                trend_analysis[period_name] = {
+                    'slope': slope,
+                    'direction': 'improving' if slope > _SLOPE_TOLERANCE else 'declining',
+                    'strength': abs(r_value),
+                    'significance': p_value < 0.05,
+                    'volatility': variation
                 }
-        
-        return improvement_analysis
+            
+            # Calculate improvement rate
+            total_change = current_value - start_value
+            daily_rate = total_change / days
+            
+            improvement_analysis[period_name] = {
+                'total_change_percent': (total_change / start_value) * 100,
+                'daily_rate': daily_rate,
+                'weekly_rate': daily_rate * 7,
+                'projected_30d': current_value + (daily_rate * 30),
+                'consistency': self._calculate_consistency(variation, int(count))
+            }
+        
+        return {
+            'historical_comparison': comparisons,
+            'trend_analysis': trend_analysis,
+            'improvement_rate': improvement_analysis
+        }
 
-    def _calculate_consistency(self, data: pd.Series) -> float:
+    def _calculate_consistency(self, variation: float, count: int) -> float:
         """
         Calculate consistency score based on variation in performance.
         
         Args:
-            data (pd.Series): Performance data
+            variation (float): Coefficient of variation (normalized standard deviation)
+            count (int): Number of performance values the variation was computed from
             
         Returns:
             float: Consistency score (0-100)
         """
-        if len(data) < 2:
+        if count < 2:
             return 100.0
-            
-        # Calculate coefficient of variation (normalized standard deviation)
-        cv = data.std() / data.mean()
         
         # Convert to consistency score (0-100)
-        consistency = 100 * (1 - min(cv, 1))
+        consistency = 100 * (1 - min(variation, 1))
         
         return consistency
 
@@ -226,24 +358,28 @@ class ProgressTracker:
             total_progress = (current_value - target_value) / abs(target_value - current_value)
             milestone_tracking['total_progress'] = max(0, min(100, total_progress * 100))
             
-            # Generate milestone points
-            milestone_values = np.linspace(current_value, target_value, num_milestones + 1)
+            # Generate milestone points and their progress in one pass
+            milestone_values = np.linspace(current_value, target_value, num_milestones + 1)[1:]
+            milestone_progress = (milestone_values - current_value) / (target_value - current_value) * 100
+            completed = current_value >= milestone_values
             
-            # Track each milestone
-            for i, value in enumerate(milestone_values[1:], 1):
-                milestone = {
-                    'level': i,
-                    'value': value,
-                    'progress': (value - current_value) / (target_value - current_value) * 100
-                }
-                
-                if current_value >= value:
-                    milestone_tracking['completed_milestones'].append(milestone)
-                else:
-                    if milestone_tracking['next_milestone'] is None:
-                        milestone_tracking['next_milestone'] = milestone
-                    else:
-                        milestone_tracking['remaining_milestones'].append(milestone)
+            milestones = [
+                {'level': level, 'value': value, 'progress': progress}
+                for level, value, progress in zip(
+                    range(1, num_milestones + 1),
+                    milestone_values.tolist(),
+                    milestone_progress.tolist()
+                )
+            ]
+            
+            # The first pending milestone is next; later pending ones remain
+            pending = np.flatnonzero(~completed).tolist()
+            milestone_tracking['completed_milestones'] = [
+                milestones[i] for i in np.flatnonzero(completed).tolist()
+            ]
+            if pending:
+                milestone_tracking['next_milestone'] = milestones[pending[0]]
+                milestone_tracking['remaining_milestones'] = [milestones[i] for i in pending[1:]]
         
         return milestone_tracking
 
@@ -266,24 +402,29 @@ class ProgressTracker:
         }
         
         for metric, analysis in progress_report.items():
+            # Look up each nested field once per metric
+            short_term_change = analysis['historical_comparison'].get('short_term', {}).get('change', 0)
+            milestones = analysis['milestone_progress']
+            completed_milestones = milestones['completed_milestones']
+            next_milestone = milestones['next_milestone']
+            
             # Check for significant improvements
-            short_term = analysis['historical_comparison'].get('short_term', {})
-            if short_term.get('change', 0) > 5:  # 5% improvement
+            if short_term_change > 5:  # 5% improvement
                 summary['key_improvements'].append({
                     'metric': metric,
-                    'improvement': short_term['change']
+                    'improvement': short_term_change
                 })
             
             # Identify areas of concern
-            if short_term.get('change', 0) < -5:  # 5% decline
+            if short_term_change < -5:  # 5% decline
                 summary['areas_of_concern'].append({
                     'metric': metric,
-                    'decline': abs(short_term['change'])
+                    'decline': abs(short_term_change)
                 })
             
             # Track recent milestones
-            if analysis['milestone_progress']['completed_milestones']:
-                latest_milestone = analysis['milestone_progress']['completed_milestones'][-1]
+            if completed_milestones:
+                latest_milestone = completed_milestones[-1]
                 summary['recent_milestones'].append({
                     'metric': metric,
                     'level': latest_milestone['level'],
@@ -291,8 +432,7 @@ class ProgressTracker:
                 })
             
             # Identify next targets
-            if analysis['milestone_progress']['next_milestone']:
-                next_milestone = analysis['milestone_progress']['next_milestone']
+            if next_milestone:
                 summary['next_targets'].append({
                     'metric': metric,
                     'target': next_milestone['value'],
@@ -341,7 +481,7 @@ class ProgressTracker:
         Returns:
             List[Dict]: Personalized improvement suggestions
         """
-        suggestions = []
+        ranked = []
         
         for metric, analysis in progress_report.items():
             # Check if improvement is needed
@@ -349,18 +489,21 @@ class ProgressTracker:
             trend = analysis['trend_analysis'].get('short_term', {})
             
             if short_term.get('change', 0) < 0 or trend.get('direction') == 'declining':
+                is_high = short_term.get('change', 0) < -5
                 suggestion = {
                     'metric': metric,
-                    'priority': 'high' if short_term.get('change', 0) < -5 else 'medium',
+                    'priority': 'high' if is_high else 'medium',
                     'focus_areas': self._identify_focus_areas(analysis),
                     'training_adjustments': self._suggest_training_adjustments(
                         analysis,
                         player_preferences
                     )
                 }
-                suggestions.append(suggestion)
+                ranked.append((0 if is_high else 1, suggestion))
         
-        return sorted(suggestions, key=lambda x: x['priority'] == 'high', reverse=True)
+        # High priority first; the sort is stable within a rank
+        ranked.sort(key=itemgetter(0))
+        return [suggestion for _, suggestion in ranked]
 
     def _identify_focus_areas(self, metric_analysis: Dict) -> List[str]:
         """
@@ -0,0 +1,33 @@
+# shared_utils.py
+
+import sys
+from types import MappingProxyType
+
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is optional; fall back to plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
+    prange = range
+
+def freeze(value, intern_strings: bool = False):
+    """
+    Recursively convert dicts to read-only mappings and lists to tuples.
+
+    Args:
+        value: Value to convert
+        intern_strings (bool): Also intern every string, so repeated template
+            text is stored once
+
+    Returns:
+        Read-only copy of the value
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({
+            key: freeze(item, intern_strings) for key, item in value.items()
+        })
+    if isinstance(value, list):
+        return tuple(freeze(item, intern_strings) for item in value)
+    if intern_strings and isinstance(value, str):
+        return sys.intern(value)
+    return value